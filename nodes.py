@@ -1,10 +1,25 @@
 import os
 import re
+import copy
+import errno
 import math
+import bisect
 import random
+import hashlib
+import mmap
+import stat
+import struct
+import tempfile
 from typing import List, Tuple, Dict
 from pathlib import Path
+from contextlib import contextmanager
 from enum import Enum
+from collections import OrderedDict
+from array import array
+
+import torch
+from safetensors import safe_open
+from safetensors.torch import save_file
 
 import folder_paths
 from comfy.sd import load_lora_for_models
@@ -15,11 +30,18 @@ import requests
 from aiohttp import web
 from server import PromptServer
 
+import asyncio
 import subprocess
+import threading
+import time
 
 
 WILDCARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wildcards')
 
+# Optional compacted LoRA cache (see LoraSidecarCache) - disabled unless a directory is given
+LORA_SIDECAR_DIR = os.environ.get("SILVER_BDP_LORA_SIDECAR_DIR", "")
+LORA_SIDECAR_DTYPE = os.environ.get("SILVER_BDP_LORA_SIDECAR_DTYPE", "fp16").lower() # fp16 | bf16 | keep
+
 DEFAULT_PROMPT = r"""### Instructions and Tips
 
 ## NEW in v3.4.0: ability to specify audio-only/visual-only weights when loading a lora from prompt (read more below)
@@ -42,10 +64,11 @@ DEFAULT_PROMPT = r"""### Instructions and Tips
 # When 'wildcard_directory\filename.txt' does not exist -> the __filename__ string will remain in the prompt.
 # Wildcards are highlighted as YELLOW when they point to a .txt file that exists - otherwise, RED. 
 # This highlight feature only supports up to 4 nested subfolders - wildcards pointing to deeper files will still work but show up as red.
-# You can add comments and combinations within wildcards but try to not create infinite loops when doing so - the node has safety against that though.
+# You can add comments and combinations within wildcards but do not create infinite loops (ex: 'a.txt' only pulling from 'b.txt' and 'b.txt' only pulling from 'a.txt') - the node refuses to run and reports the looping files. Recursion through a random choice is fine, it is simply capped.
 
     __ThisIsAWildCard__ # pulls from 'wildcard_directory\ThisIsAWildCard.txt' but I don't have that file so this string will appear in the final prompt
     __Folder1\Folder2\ThisIsAWildCard__ # sub-directory support - will pull from 'wildcard_directory\Folder1\Folder2\ThisIsAWildCard.txt'
+    __Folder1\*__ # folder pool - pulls a random line across every TXT file directly stored in 'wildcard_directory\Folder1' (no need for a merged TXT file)
 
 ## You can nest combinations and wildcards at will (ex: combination within wildcard within combination ...)
 
@@ -107,166 +130,809 @@ DEFAULT_PROMPT = r"""### Instructions and Tips
 
 """
 
-def dynamic_prompts(
-    prompt: str, 
-    seed: int, 
-    line_suffix: str = "", 
-    single_line_output: bool = True,
-    remove_whitespaces: bool = True,
-    remove_empty_tags: bool = True,
-    wildcard_dir: str = WILDCARD_DIR) -> str:
+def clean_wildcard_line(line: str) -> str:
+    """
+    Returns a wildcard file line without its comment and surrounding whitespace - empty when the line must be ignored.
+    """
+    trimmed = line.strip()
+    if not trimmed or trimmed.startswith('#'):
+        return ""
+    comment_idx = trimmed.find('#')
+    if comment_idx != -1:
+        trimmed = trimmed[:comment_idx].strip()
+    return trimmed
+
+
+# Expansion limits of 'dynamic_prompts' - wildcard loops that can never end are rejected beforehand by 'WildcardGraph.check',
+# the limits still stop optional recursion (ex: '{a|__self__}') and wildcards/combinations created at runtime (ex: '__{a|b}__')
+MAX_PROCESS_PASSES = 30
+MAX_WILDCARD_PASSES = 10
+MAX_COMBINATION_PASSES = 30
+
+WILDCARD_REF_PATTERN = re.compile(r'__(.+?)__')
+
+
+# Per-user folder: the files are only trusted because nobody else can write there (see 'SharedIndexStore._secure_directory')
+SHARED_INDEX_DIR = os.path.join(tempfile.gettempdir(), f"silver_basicdynamicprompts_index-{os.getuid()}" if hasattr(os, "getuid") else "silver_basicdynamicprompts_index")
+
+
+class StringTable:
+    """
+    Read-only sequence of strings stored in a buffer (bytes or mmap) without copying it:
+    int64 count, (count + 1) int64 offsets into the blob, then the UTF-8 blob itself.
+    """
+    def __init__(self, buffer, offset: int = 0):
+        view = memoryview(buffer)
+        count = struct.unpack_from("=q", view, offset)[0]
+        offsets_start = offset + 8
+        blob_start = offsets_start + 8 * (count + 1)
+        if count < 0 or blob_start > len(view):
+            raise ValueError("Invalid string table")
+        self._offsets = view[offsets_start:blob_start].cast('q')
+        self._blob = view[blob_start:]
+        self._count = count
+        if self._offsets[0] != 0 or self._offsets[count] > len(self._blob) or any(self._offsets[i] > self._offsets[i + 1] for i in range(count)):
+            raise ValueError("Invalid string table")
+    
+    @staticmethod
+    def serialize(strings: List[str]) -> bytes:
+        encoded = [s.encode('utf-8', errors='surrogatepass') for s in strings]
+        offsets = array('q', [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        payload = struct.pack("=q", len(encoded)) + offsets.tobytes() + b"".join(encoded)
+        return payload + b"\0" * (-len(payload) % 8) # keep the next table 8-byte aligned
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode('utf-8', errors='surrogatepass')
+    
+    def find(self, key: str) -> int:
+        """
+        Index of 'key' in a table sorted in ascending order, -1 when missing.
+        """
+        index = bisect.bisect_left(self, key)
+        return index if index < self._count and self[index] == key else -1
+
+
+class SharedIndexStore:
+    """
+    Host-wide store of immutable StringTable bundles shared by every ComfyUI process of the same user.
     
-    # Updated _fix_prompt signature and logic
-    def _fix_prompt(
-        prompt: str, 
-        line_suffix: str, 
-        single_line_output: bool,
-        remove_whitespaces: bool,
-        remove_empty_tags: bool,
-    ) -> str:
-        """
-        Processes the prompt by:
-        1. Removing comments.
-        2. Applying line suffix and optionally trimming (based on remove_whitespaces).
-        3. Combining lines (based on single_line_output).
-        4. Applying default prompt cleaning (e.g., ",," -> ",").
-        5. Optionally removing empty tags (based on remove_empty_tags).
+    A bundle is identified by (kind, key, version) and lives in its own file under SHARED_INDEX_DIR - the version is part of the filename
+    so a published file is never modified. The first process that needs a bundle builds and publishes it (atomic rename),
+    every other process attaches to the same file read-only (mmap for large ones): the data is only held once in the OS page cache.
+    The directory must be owned by the current user and closed to everyone else, otherwise bundles are simply kept in process memory.
+    """
+    MAGIC = b"SBDPIDX2" # bumped whenever the tables of a bundle kind change
+    MMAP_MIN_SIZE = 64 * 1024 # smaller bundles are read: an mmap keeps a file descriptor open for as long as the bundle is attached
+    MAX_ATTACHED = 4096
+    BUILD_WAIT = 30.0 # seconds a process waits for another one building the same bundle before building it itself
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._attached: OrderedDict[Tuple[str, str], Tuple[str, List[StringTable]]] = OrderedDict() # (kind, key) -> (filename, tables)
+        self.builds = 0
+        self.attaches = 0
+    
+    @staticmethod
+    def _digest(value) -> str:
+        return hashlib.sha1(repr(value).encode('utf-8', errors='surrogatepass')).hexdigest()[:16]
     
-        Args:
-            prompt (str): The initial string.
-            line_suffix (str): String to append to each line.
-            single_line_output (bool): If True, joins lines with a space; otherwise, joins with a newline.
-            remove_whitespaces (bool): If True, strips lines and removes empty ones.
-            remove_empty_tags (bool): If True, removes redundant separators like ' , ,' or ' , .'
+    @classmethod
+    def _serialize(cls, tables: List[List[str]]) -> bytes:
+        header_size = 16 + 8 * len(tables)
+        chunks = [StringTable.serialize(table) for table in tables]
+        offsets, position = [], header_size
+        for chunk in chunks:
+            offsets.append(position)
+            position += len(chunk)
+        return cls.MAGIC + struct.pack("=q", len(tables)) + struct.pack(f"={len(tables)}q", *offsets) + b"".join(chunks)
     
-        Returns:
-            str: The modified string.
+    @classmethod
+    def _load(cls, buffer) -> List[StringTable] | None:
+        if len(buffer) < 16 or bytes(buffer[:8]) != cls.MAGIC:
+            return None
+        count = struct.unpack_from("=q", buffer, 8)[0]
+        offsets = struct.unpack_from(f"={count}q", buffer, 16)
+        return [StringTable(buffer, offset) for offset in offsets]
+    
+    def _secure_directory(self) -> bool:
         """
-        
-        # --- Start of Modified Preprocessing Code ---
-        cleaned_lines = []
-        lines = prompt.splitlines()
+        Creates the directory (owner only) and checks that it is still a real folder that only the current user can write to.
+        """
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            if not hasattr(os, "getuid"):
+                return True # Windows: the temp folder is already per-user
+            st = os.lstat(self.directory)
+            if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+                return False
+            if st.st_mode & 0o077:
+                os.chmod(self.directory, 0o700)
+            return True
+        except OSError:
+            return False
+    
+    def _attach(self, path: str) -> List[StringTable] | None:
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < self.MMAP_MIN_SIZE:
+                    buffer = f.read()
+                else:
+                    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._load(buffer)
+        except Exception:
+            return None # missing, truncated or corrupted -> rebuilt and published again
+    
+    def _publish(self, path: str, data: bytes):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
     
-        for line in lines:
-            # Find the index of the first '#' character (comment delimiter)
-            comment_start_index = line.find('#')
+    def _claim_build(self, path: str) -> bool:
+        """
+        Creates the build marker of a bundle file. False when another process (or thread) is already building that bundle.
+        """
+        marker = path + ".lock"
+        try:
+            os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+            return True
+        except FileExistsError:
+            try:
+                return time.time() - os.stat(marker).st_mtime >= self.BUILD_WAIT # left behind by a process that died while building
+            except OSError:
+                return False # just released: the bundle is published
+        except OSError:
+            return True
     
-            if comment_start_index != -1:
-                line_without_comment = line[:comment_start_index]
-            else:
-                line_without_comment = line
-    
-            # Apply trimming if remove_whitespaces is True
-            trimmed_line = line_without_comment.strip() if remove_whitespaces else line_without_comment
-            if remove_whitespaces:
-                while ("  " in trimmed_line):
-                    trimmed_line = trimmed_line.replace("  ", " ")
-    
-            # Apply the specified line_suffix
-            if trimmed_line:
-                # Only add suffix if the line is not empty after stripping
-                final_line = trimmed_line + line_suffix
-                
-                # Only add non-empty lines to the cleaned list
-                cleaned_lines.append(final_line)
-    
-        # Convert the cleaned lines back into a single/multi-line string
-        # Join with " " for single line output, or "\n" for multi-line output
-        joiner = " " if single_line_output else "\n"
-        prompt = joiner.join(cleaned_lines)
-        # --- End of Modified Preprocessing Code ---
-        
-        # Default cleaning replacements 
-        replacements = {}
-        replacements[" ,"] = ","
-        replacements[",  "] = ", "
-        replacements[" ."] = "."
-        replacements[".  "] = ". "
-        replacements[".,"] = "."
-        replacements[",."] = ","
-        replacements[",,"] = ","
-        replacements[".."] = "."
-        
-        empty_tag_replacements = [".,", ",.", ",,", ".."]
-        
-        # Sort replacements by key length in descending order
-        sorted_replacements = sorted(replacements.items(), key=lambda item: len(item[0]), reverse=True)
-    
-        # The replacement loop runs until no changes are made.
-        while True:
-            replacement_made_in_pass = False
-            current_prompt_state = prompt
+    def _release_build(self, path: str):
+        try:
+            os.remove(path + ".lock")
+        except OSError:
+            pass
     
-            for old_substring, new_substring in sorted_replacements:
-            
-                if not remove_empty_tags and old_substring in empty_tag_replacements:
-                    continue
-            
-                temp_prompt = current_prompt_state
+    def _wait_for_build(self, path: str) -> List[StringTable] | None:
+        """
+        Waits for the process building 'path' to publish it. None when it failed or took longer than BUILD_WAIT.
+        """
+        deadline = time.monotonic() + self.BUILD_WAIT
+        while time.monotonic() < deadline:
+            tables = self._attach(path)
+            if tables is not None or not os.path.exists(path + ".lock"):
+                return tables if tables is not None else self._attach(path)
+            time.sleep(0.01)
+        return None
+    
+    def get(self, kind: str, key: str, version, build) -> List[StringTable]:
+        """
+        Returns the tables of the (kind, key, version) bundle, calling 'build()' -> List[List[str]] only when no process published it yet.
+        Processes asking for the same missing bundle at the same time wait for the first one instead of all building it.
+        """
+        filename = f"{kind}-{self._digest(key)}-{self._digest(version)}.idx"
+        with self._lock:
+            attached = self._attached.get((kind, key))
+            if attached is not None and attached[0] == filename:
+                self._attached.move_to_end((kind, key))
+                return attached[1]
+        
+        path = os.path.join(self.directory, filename)
+        shared = self._secure_directory()
+        tables = self._attach(path) if shared else None
+        claimed = False
+        if tables is None and shared:
+            claimed = self._claim_build(path)
+            tables = self._attach(path) if claimed else self._wait_for_build(path) # may have been published meanwhile
+        if tables is not None:
+            self.attaches += 1
+            if claimed:
+                self._release_build(path)
+        else:
+            try:
+                data = self._serialize(build())
+                self.builds += 1
+                if shared:
+                    self._publish(path, data)
+                    if attached is not None: # the previous version is not needed anymore (it stays readable by processes that mapped it)
+                        try:
+                            os.remove(os.path.join(self.directory, attached[0]))
+                        except OSError:
+                            pass
+            finally:
+                if claimed:
+                    self._release_build(path)
+            tables = self._load(data)
+        
+        with self._lock:
+            self._attached[(kind, key)] = (filename, tables)
+            self._attached.move_to_end((kind, key))
+            while len(self._attached) > self.MAX_ATTACHED:
+                self._attached.popitem(last=False)
+        return tables
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {"directory": self.directory, "attached": len(self._attached), "builds": self.builds, "attaches": self.attaches}
+
+
+SHARED_INDEX = SharedIndexStore(SHARED_INDEX_DIR)
+
+
+_WILDCARD_READS = threading.local()
+
+def path_stamp(path: str) -> tuple | None:
+    """
+    (file type, inode, size, mtime) of a wildcard file or folder, None when it does not exist.
+    Inside 'wildcard_reads' scopes a path is only stat'ed once and its stamp is recorded by every open scope.
+    """
+    scopes = getattr(_WILDCARD_READS, "scopes", ())
+    for reads in scopes:
+        if path in reads:
+            stamp = reads[path]
+            break
+    else:
+        try:
+            st = os.stat(path)
+            stamp = (stat.S_IFMT(st.st_mode), st.st_ino, st.st_size, st.st_mtime_ns)
+        except OSError:
+            stamp = None
+    for reads in scopes:
+        reads.setdefault(path, stamp)
+    return stamp
+
+
+@contextmanager
+def wildcard_reads():
+    """
+    Records the stamp of every wildcard file and folder looked at inside the block (see 'path_stamp') into the yielded dict.
+    """
+    if not hasattr(_WILDCARD_READS, "scopes"):
+        _WILDCARD_READS.scopes = []
+    reads = {}
+    _WILDCARD_READS.scopes.append(reads)
+    try:
+        yield reads
+    finally:
+        _WILDCARD_READS.scopes.pop()
+
+
+def stamps_unchanged(stamps) -> bool:
+    """
+    True when every (path, stamp) pair recorded by 'wildcard_reads' still matches the file system.
+    """
+    return all(path_stamp(path) == stamp for path, stamp in stamps)
+
+
+def read_wildcard_lines(file_path: str) -> List[str]:
+    """
+    Returns the valid lines (see 'clean_wildcard_line') of a wildcard file.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        file_content = f.read()
+    
+    # Filter lines (ignore empty and comment lines)
+    lines = []
+    for line in file_content.splitlines():
+        trimmed = clean_wildcard_line(line)
+        if trimmed:
+            lines.append(trimmed)
+    return lines
+
+
+def read_wildcard_file(file_path: str) -> List[List[str]]:
+    """
+    Returns the valid lines of a wildcard file and the sorted distinct sets of required wildcard names of those lines
+    (see 'WildcardGraph.required_refs', one '\n' separated string per set - "" when a line requires none).
+    """
+    lines = read_wildcard_lines(file_path)
+    ref_sets = {"\n".join(dict.fromkeys(WildcardGraph.required_refs(line))) for line in lines}
+    return [lines, sorted(ref_sets)]
+
+
+def get_wildcard_file(file_path: str) -> List[StringTable]:
+    """
+    Shared (see SHARED_INDEX) tables of a wildcard file (see 'read_wildcard_file') - only rebuilt when the file size/mtime changes,
+    so editing one file never invalidates the others and an unchanged file is never parsed again. Raises like 'open' when it cannot be read.
+    """
+    stamp = path_stamp(file_path)
+    if stamp is None:
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), file_path)
+    return SHARED_INDEX.get("lines", os.path.abspath(file_path), (stamp[2], stamp[3]), lambda: read_wildcard_file(file_path))
+
+
+def get_wildcard_lines(file_path: str) -> StringTable:
+    """
+    Shared table of the valid lines of a wildcard file (see 'get_wildcard_file').
+    """
+    return get_wildcard_file(file_path)[0]
+
+
+def read_folder_listing(folder: str) -> List[List[str]]:
+    """
+    Case-insensitive lookup tables of a wildcard folder, first 'os.listdir' match wins:
+    sorted lowercase subfolder names and their real names, sorted lowercase .txt file stems and their real filenames,
+    then the sorted filenames of every .txt file (folder pool members).
+    """
+    dirs, files, pool = {}, {}, []
+    for e in os.listdir(folder):
+        entry_path = os.path.join(folder, e)
+        if os.path.isdir(entry_path):
+            dirs.setdefault(e.lower(), e)
+        base_name, ext = os.path.splitext(e)
+        if ext.lower() == '.txt':
+            files.setdefault(base_name.lower(), e)
+            if os.path.isfile(entry_path):
+                pool.append(e)
+    dir_keys, file_keys = sorted(dirs), sorted(files)
+    return [dir_keys, [dirs[k] for k in dir_keys], file_keys, [files[k] for k in file_keys], sorted(pool)]
+
+
+def get_folder_listing(folder: str) -> List[StringTable] | None:
+    """
+    Shared (see SHARED_INDEX) lookup tables of a wildcard folder (see 'read_folder_listing') - only rebuilt when the folder mtime
+    changes, which happens whenever one of its entries is added, removed or renamed. None when the folder cannot be listed.
+    """
+    stamp = path_stamp(folder)
+    if stamp is None or not stat.S_ISDIR(stamp[0]):
+        return None
+    try:
+        return SHARED_INDEX.get("folder", os.path.abspath(folder), (stamp[1], stamp[3]), lambda: read_folder_listing(folder))
+    except OSError:
+        return None
+
+
+class WildcardPoolIndex:
+    """
+    Merged index over every .txt file directly inside a wildcard folder - used by '__folder/*__' wildcards.
     
-                pattern = re.compile(re.escape(old_substring), re.IGNORECASE)
+    The folder gets the cumulative valid line count of its files, whose lines come from the shared per-file tables (see 'get_wildcard_lines').
+    Picking a line is a bisect over the cumulative counts followed by a lookup in the chosen file table, so the folder is never concatenated.
+    The cumulative counts are rebuilt whenever a file of the folder is added, removed or changed.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._folders: Dict[str, Tuple[tuple, List[StringTable], List[int]]] = {} # folder path -> (signature, tables, cumulative counts)
     
-                replacements_to_make_in_this_pass = []
-                for match in pattern.finditer(temp_prompt):
-                    start, end = match.span()
+    def files(self, folder: str) -> List[str]:
+        """
+        Paths of the .txt files of the pool, sorted.
+        """
+        return [file_path for file_path, _, _ in self._signature(folder)]
+    
+    def _signature(self, folder: str) -> tuple:
+        """
+        (path, size, mtime) of each pool file: the members come from the shared folder listing (see 'get_folder_listing'),
+        so nothing is listed again until the folder changes and each file is only stat'ed once per 'wildcard_reads' scope.
+        """
+        listing = get_folder_listing(folder)
+        if listing is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), folder)
+        files = []
+        for filename in listing[4]:
+            file_path = os.path.join(folder, filename)
+            stamp = path_stamp(file_path)
+            if stamp is not None and stat.S_ISREG(stamp[0]):
+                files.append((file_path, stamp[2], stamp[3]))
+        return tuple(files)
+    
+    def _folder_index(self, folder: str) -> Tuple[List[StringTable], List[int]]:
+        signature = self._signature(folder)
+        with self._lock:
+            cached = self._folders.get(folder)
+        if cached is not None and cached[0] == signature:
+            return cached[1], cached[2]
+        
+        tables, cumulative, total = [], [], 0
+        for file_path, _, _ in signature:
+            table = get_wildcard_lines(file_path)
+            if len(table) == 0:
+                continue
+            total += len(table)
+            tables.append(table)
+            cumulative.append(total)
+        with self._lock:
+            self._folders[folder] = (signature, tables, cumulative)
+        return tables, cumulative
+    
+    def pick(self, folder: str) -> str:
+        """
+        Returns a uniformly chosen valid line across all .txt files of 'folder' ("" when they have no valid line).
+        Same draw as 'random.choice' over the concatenated lines. Raises when the folder or one of its files cannot be read.
+        """
+        tables, cumulative = self._folder_index(folder)
+        if not cumulative:
+            return ""
+        k = random.choice(range(cumulative[-1]))
+        file_idx = bisect.bisect_right(cumulative, k)
+        return tables[file_idx][k - (cumulative[file_idx - 1] if file_idx > 0 else 0)]
+
+
+WILDCARD_POOL_INDEX = WildcardPoolIndex()
+
+
+def wildcard_name_parts(wildcard_name: str) -> List[str]:
+    """
+    Splits the text between '__' delimiters into path parts ('.txt' suffix removed, '/' and '\\' separators).
+    """
+    wildcard_name = wildcard_name.strip()
     
-                    # Check if this match is inside any <...> tag
-                    tag_start_index = temp_prompt.rfind('<', 0, start)
-                    if tag_start_index != -1:
-                        tag_end_index = temp_prompt.find('>', tag_start_index)
-                        if tag_end_index != -1 and tag_end_index > start:
-                            continue
+    if wildcard_name.lower().endswith('.txt'):
+        wildcard_name = wildcard_name[:-4]
     
-                    replacements_to_make_in_this_pass.append((start, end, new_substring))
+    # Normalize separators and split into parts
+    normalized = re.sub(r'[\\/]+', '/', wildcard_name)
+    return [p for p in normalized.split('/') if p]
+
+
+def case_insensitive_resolve_dir(base_dir: str, dir_parts: list[str]) -> str | None:
+    """
+    Resolves a nested folder inside base_dir in a case-insensitive way.
+    Returns absolute path to the folder if found, else None.
+    """
+    current_dir = base_dir
     
+    for part in dir_parts:
+        listing = get_folder_listing(current_dir)
+        if listing is None:
+            return None
+        
+        dir_keys, dir_names = listing[0], listing[1]
+        match = dir_keys.find(part.lower())
+        if match == -1:
+            return None
+        current_dir = os.path.join(current_dir, dir_names[match])
     
-                # Apply replacements from right to left
-                for start, end, new_sub in sorted(replacements_to_make_in_this_pass, key=lambda x: x[0], reverse=True):
-                    current_prompt_state = current_prompt_state[:start] + new_sub + current_prompt_state[end:]
-                    replacement_made_in_pass = True
+    return current_dir
+
+
+def case_insensitive_resolve(base_dir: str, path_parts: list[str]) -> str | None:
+    """
+    Resolves a nested path inside base_dir in a case-insensitive way.
+    Only lists contents one level at a time (no recursion).
+    Returns absolute path to the file if found, else None.
+    """
+    current_dir = case_insensitive_resolve_dir(base_dir, path_parts[:-1])
+    if current_dir is None:
+        return None
+    
+    # Last part should be a file (case-insensitive match for .txt)
+    listing = get_folder_listing(current_dir)
+    if listing is None:
+        return None
+    
+    file_keys, file_names = listing[2], listing[3]
+    match = file_keys.find(path_parts[-1].lower())
+    if match == -1:
+        return None
+    return os.path.join(current_dir, file_names[match])
+
+
+def resolve_wildcard(wildcard_dir: str, wildcard_name: str) -> str | None:
+    """
+    Returns the file a wildcard points to, or the folder followed by '*' for a folder pool ('__folder/*__'), None when it does not resolve.
+    """
+    parts = wildcard_name_parts(wildcard_name)
+    if not parts:
+        return None
+    
+    if parts[-1] == '*':
+        folder = case_insensitive_resolve_dir(wildcard_dir, parts[:-1])
+        return None if folder is None else os.path.join(folder, '*')
+    
+    filepath = case_insensitive_resolve(wildcard_dir, parts)
+    stamp = path_stamp(filepath) if filepath else None
+    if stamp is None or not stat.S_ISREG(stamp[0]):
+        return None
+    return filepath
+
+
+class WildcardGraph:
+    """
+    Dependency graph of the wildcard files of a directory, explored on demand from the wildcards of a prompt.
+    Nodes are the resolved wildcard targets (a file or a folder pool). Only required wildcards make edges: the ones outside of comments
+    and '{...}' combinations, which are expanded whatever the random choices - optional ones may simply never be picked.
     
-            if not replacement_made_in_pass:
-                break
+    A node only needs the distinct sets of required wildcards of its lines, which are stored with the shared line table of each file
+    (see 'get_wildcard_file'). The edges of a node are kept (see 'get_wildcard_graph') along with the stamps of every file and folder
+    they were resolved from, and only resolved again once one of those changed.
+    """
+    def __init__(self, wildcard_dir: str):
+        self.wildcard_dir = wildcard_dir
+        self._lock = threading.Lock()
+        self._line_targets: Dict[str, Tuple[tuple, List[Tuple[str, ...]]]] = {} # node -> (stamps, targets of each distinct set of lines)
     
-            prompt = current_prompt_state
+    @staticmethod
+    def required_refs(text: str) -> List[str]:
+        """
+        Wildcard names of 'text' that are outside of comments ('#' until the end of the line) and outside of '{...}' combinations.
+        """
+        if "__" not in text:
+            return []
+        if "#" not in text and "{" not in text:
+            return WILDCARD_REF_PATTERN.findall("\n".join(text.splitlines()))
         
-        # --- Logic for remove_empty_tags ---
-        if remove_empty_tags:
-            temp_prompt = prompt
-            
-            # Simple cleanup of spacing before running the final delimiter removal
-            temp_prompt = temp_prompt.replace(", ", ",").replace(" ,", ",").replace(" .", ".").replace(". ", ".")
-            temp_prompt = temp_prompt.replace(",", ", ")
-            temp_prompt = re.sub(r'\.(?!\d)', '. ', temp_prompt) # replaces '.' -> '. ' Only if there is no immediate digit after the dot
-            
-            # Use a loop to remove sequences of a delimiter, optional space, and another delimiter.
+        kept, depth = [], 0
+        for line in text.splitlines():
+            chars = []
+            for c in line.split('#', 1)[0]:
+                if c == '{':
+                    depth += 1
+                elif c == '}' and depth > 0:
+                    depth -= 1
+                    chars.append(' ') # never glue the text around a combination into a wildcard name
+                elif depth == 0:
+                    chars.append(c)
+            kept.append("".join(chars))
+        return WILDCARD_REF_PATTERN.findall("\n".join(kept))
+    
+    def targets(self, wildcard_names) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(t for t in (resolve_wildcard(self.wildcard_dir, name) for name in wildcard_names) if t is not None))
+    
+    def node_name(self, node: str) -> str:
+        return os.path.relpath(node, self.wildcard_dir)
+    
+    def ref_sets(self, node: str) -> set:
+        """
+        Distinct sets of required wildcard names of the lines of 'node' (one string per set, see 'read_wildcard_file').
+        """
+        try:
+            if os.path.basename(node) == '*':
+                return {refs for file_path in WILDCARD_POOL_INDEX.files(os.path.dirname(node)) for refs in get_wildcard_file(file_path)[1]}
+            return set(get_wildcard_file(node)[1])
+        except Exception:
+            return set() # reported when the wildcard is expanded
+    
+    def line_targets(self, node: str) -> List[Tuple[str, ...]]:
+        """
+        The targets of the required wildcards of each line of 'node' (one possible choice), lines with the same targets merged.
+        """
+        with self._lock:
+            cached = self._line_targets.get(node)
+        if cached is not None and stamps_unchanged(cached[0]):
+            return cached[1]
+        
+        with wildcard_reads() as reads:
+            line_targets = list(dict.fromkeys(self.targets(refs.split("\n") if refs else ()) for refs in sorted(self.ref_sets(node))))
+        with self._lock:
+            self._line_targets[node] = (tuple(reads.items()), line_targets)
+        return line_targets
+    
+    def _endless(self, roots: List[str]) -> set:
+        """
+        Nodes reachable from 'roots' whose expansion can never end: every line of the node requires at least one endless node.
+        A single line without such a wildcard is a way out, so probabilistic recursion (ex: 'plain' / '__self__ again') is allowed.
+        """
+        reachable, pending = set(roots), list(roots)
+        while pending:
+            for line in self.line_targets(pending.pop()):
+                for child in line:
+                    if child not in reachable:
+                        reachable.add(child)
+                        pending.append(child)
+        
+        # Greatest fixed point: start from every candidate and drop the nodes that have a way out until nothing changes
+        endless = {node for node in reachable if self.line_targets(node)}
+        changed = True
+        while changed:
+            changed = False
+            for node in list(endless):
+                if not all(any(child in endless for child in line) for line in self.line_targets(node)):
+                    endless.discard(node)
+                    changed = True
+        return endless
+    
+    def check(self, prompt: str):
+        """
+        Raises ValueError with the offending file chain when a required wildcard of 'prompt' can never be fully expanded.
+        Loops that only go through optional choices are left to the expansion limits of 'dynamic_prompts'.
+        """
+        roots = list(self.targets(self.required_refs(prompt)))
+        if not roots:
+            return
+        endless = self._endless(roots)
+        for root in roots:
+            if root not in endless:
+                continue
+            path = [root]
             while True:
-                initial_len = len(temp_prompt)
-                # Replace pattern (separator, optional space, separator) with a single separator
-                # e.g., ', , ' -> ', '
-                temp_prompt = re.sub(r'([.,])\s*([.,])', r'\1 ', temp_prompt)
-                
-                if len(temp_prompt) == initial_len:
-                    break
-            
-            # Final cleaning of delimiters (e.g. 'cat,, dog' -> 'cat, dog')
-            temp_prompt = temp_prompt.replace(",,", ",").replace("..", ".")
-            prompt = temp_prompt
+                node = next(child for child in self.line_targets(path[-1])[0] if child in endless)
+                if node in path:
+                    chain = path[path.index(node):] + [node]
+                    raise ValueError("[SILVER_BasicDynamicPrompts] Wildcard loop detected: " + " -> ".join(self.node_name(n) for n in chain))
+                path.append(node)
+
+
+MAX_WILDCARD_GRAPHS = 32
+WILDCARD_GRAPHS: OrderedDict[str, WildcardGraph] = OrderedDict() # wildcard_dir -> graph, least recently used first
+WILDCARD_GRAPHS_LOCK = threading.Lock()
+
+def get_wildcard_graph(wildcard_dir: str) -> WildcardGraph:
+    """
+    The persistent WildcardGraph of a wildcard directory (the MAX_WILDCARD_GRAPHS most recently used ones are kept).
+    """
+    with WILDCARD_GRAPHS_LOCK:
+        graph = WILDCARD_GRAPHS.get(wildcard_dir)
+        if graph is None:
+            graph = WILDCARD_GRAPHS[wildcard_dir] = WildcardGraph(wildcard_dir)
+        WILDCARD_GRAPHS.move_to_end(wildcard_dir)
+        while len(WILDCARD_GRAPHS) > MAX_WILDCARD_GRAPHS:
+            WILDCARD_GRAPHS.popitem(last=False)
+        return graph
+
+
+def _fix_prompt(
+    prompt: str, 
+    line_suffix: str, 
+    single_line_output: bool,
+    remove_whitespaces: bool,
+    remove_empty_tags: bool,
+) -> str:
+    """
+    Processes the prompt by:
+    1. Removing comments.
+    2. Applying line suffix and optionally trimming (based on remove_whitespaces).
+    3. Combining lines (based on single_line_output).
+    4. Applying default prompt cleaning (e.g., ",," -> ",").
+    5. Optionally removing empty tags (based on remove_empty_tags).
+
+    Args:
+        prompt (str): The initial string.
+        line_suffix (str): String to append to each line.
+        single_line_output (bool): If True, joins lines with a space; otherwise, joins with a newline.
+        remove_whitespaces (bool): If True, strips lines and removes empty ones.
+        remove_empty_tags (bool): If True, removes redundant separators like ' , ,' or ' , .'
+
+    Returns:
+        str: The modified string.
+    """
+    
+    # --- Start of Modified Preprocessing Code ---
+    cleaned_lines = []
+    lines = prompt.splitlines()
+
+    for line in lines:
+        # Find the index of the first '#' character (comment delimiter)
+        comment_start_index = line.find('#')
+
+        if comment_start_index != -1:
+            line_without_comment = line[:comment_start_index]
+        else:
+            line_without_comment = line
+
+        # Apply trimming if remove_whitespaces is True
+        trimmed_line = line_without_comment.strip() if remove_whitespaces else line_without_comment
+        if remove_whitespaces:
+            while ("  " in trimmed_line):
+                trimmed_line = trimmed_line.replace("  ", " ")
+
+        # Apply the specified line_suffix
+        if trimmed_line:
+            # Only add suffix if the line is not empty after stripping
+            final_line = trimmed_line + line_suffix
             
+            # Only add non-empty lines to the cleaned list
+            cleaned_lines.append(final_line)
+
+    # Convert the cleaned lines back into a single/multi-line string
+    # Join with " " for single line output, or "\n" for multi-line output
+    joiner = " " if single_line_output else "\n"
+    prompt = joiner.join(cleaned_lines)
+    # --- End of Modified Preprocessing Code ---
+    
+    # Default cleaning replacements 
+    replacements = {}
+    replacements[" ,"] = ","
+    replacements[",  "] = ", "
+    replacements[" ."] = "."
+    replacements[".  "] = ". "
+    replacements[".,"] = "."
+    replacements[",."] = ","
+    replacements[",,"] = ","
+    replacements[".."] = "."
+    
+    empty_tag_replacements = [".,", ",.", ",,", ".."]
+    
+    # Sort replacements by key length in descending order
+    sorted_replacements = sorted(replacements.items(), key=lambda item: len(item[0]), reverse=True)
+
+    # The replacement loop runs until no changes are made.
+    while True:
+        replacement_made_in_pass = False
+        current_prompt_state = prompt
+
+        for old_substring, new_substring in sorted_replacements:
+        
+            if not remove_empty_tags and old_substring in empty_tag_replacements:
+                continue
+        
+            temp_prompt = current_prompt_state
+
+            pattern = re.compile(re.escape(old_substring), re.IGNORECASE)
+
+            replacements_to_make_in_this_pass = []
+            for match in pattern.finditer(temp_prompt):
+                start, end = match.span()
+
+                # Check if this match is inside any <...> tag
+                tag_start_index = temp_prompt.rfind('<', 0, start)
+                if tag_start_index != -1:
+                    tag_end_index = temp_prompt.find('>', tag_start_index)
+                    if tag_end_index != -1 and tag_end_index > start:
+                        continue
+
+                replacements_to_make_in_this_pass.append((start, end, new_substring))
+
+
+            # Apply replacements from right to left
+            for start, end, new_sub in sorted(replacements_to_make_in_this_pass, key=lambda x: x[0], reverse=True):
+                current_prompt_state = current_prompt_state[:start] + new_sub + current_prompt_state[end:]
+                replacement_made_in_pass = True
+
+        if not replacement_made_in_pass:
+            break
+
+        prompt = current_prompt_state
+    
+    # --- Logic for remove_empty_tags ---
+    if remove_empty_tags:
+        temp_prompt = prompt
+        
+        # Simple cleanup of spacing before running the final delimiter removal
+        temp_prompt = temp_prompt.replace(", ", ",").replace(" ,", ",").replace(" .", ".").replace(". ", ".")
+        temp_prompt = temp_prompt.replace(",", ", ")
+        temp_prompt = re.sub(r'\.(?!\d)', '. ', temp_prompt) # replaces '.' -> '. ' Only if there is no immediate digit after the dot
+        
+        # Use a loop to remove sequences of a delimiter, optional space, and another delimiter.
+        while True:
+            initial_len = len(temp_prompt)
+            # Replace pattern (separator, optional space, separator) with a single separator
+            # e.g., ', , ' -> ', '
+            temp_prompt = re.sub(r'([.,])\s*([.,])', r'\1 ', temp_prompt)
             
-        prompt = prompt.strip()
-        # The existing loop to remove leading/trailing delimiters/spaces
-        while prompt.startswith(",") or prompt.startswith(".") or prompt.startswith(" ") or prompt.endswith(",") or prompt.endswith(" "):
-            try:
-                if prompt.startswith(",") or prompt.startswith(".") or prompt.startswith(" "):
-                    prompt = prompt[1:].strip() # Strip again after removing
-                if prompt.endswith(",") or prompt.endswith(" "):
-                    prompt = prompt[:-1].strip() # Strip again after removing
-            except:
+            if len(temp_prompt) == initial_len:
                 break
         
-        return prompt
+        # Final cleaning of delimiters (e.g. 'cat,, dog' -> 'cat, dog')
+        temp_prompt = temp_prompt.replace(",,", ",").replace("..", ".")
+        prompt = temp_prompt
+        
+        
+    prompt = prompt.strip()
+    # The existing loop to remove leading/trailing delimiters/spaces
+    while prompt.startswith(",") or prompt.startswith(".") or prompt.startswith(" ") or prompt.endswith(",") or prompt.endswith(" "):
+        try:
+            if prompt.startswith(",") or prompt.startswith(".") or prompt.startswith(" "):
+                prompt = prompt[1:].strip() # Strip again after removing
+            if prompt.endswith(",") or prompt.endswith(" "):
+                prompt = prompt[:-1].strip() # Strip again after removing
+        except:
+            break
     
+    return prompt
+
+
+def dynamic_prompts(
+    prompt: str, 
+    seed: int, 
+    line_suffix: str = "", 
+    single_line_output: bool = True,
+    remove_whitespaces: bool = True,
+    remove_empty_tags: bool = True,
+    wildcard_dir: str = WILDCARD_DIR) -> str:
     
     def _process_wildcards(prompt: str, wildcard_dir: str, seed: int) -> str:
         """
@@ -292,7 +958,8 @@ def dynamic_prompts(
             return prompt
         
         wildcard_path = Path(wildcard_dir)
-        valid_wildcard_path = wildcard_path.exists() and wildcard_path.is_dir() and (str(wildcard_path.resolve()) != str(wildcard_path.anchor))
+        wildcard_dir_stamp = path_stamp(wildcard_dir) # recorded: the result changes once the folder is created
+        valid_wildcard_path = wildcard_dir_stamp is not None and stat.S_ISDIR(wildcard_dir_stamp[0]) and (str(wildcard_path.resolve()) != str(wildcard_path.anchor))
         if not valid_wildcard_path:
             print(f"[SILVER_BasicDynamicPrompts] Invalid wildcard_directory: {wildcard_dir}")
             return prompt
@@ -303,72 +970,31 @@ def dynamic_prompts(
         # Regex to find '__something__' or '__something.txt__'
         pattern = re.compile(r'__(.+?)__')
         
-        def case_insensitive_resolve(base_dir: str, path_parts: list[str]) -> str | None:
-            """
-            Resolves a nested path inside base_dir in a case-insensitive way.
-            Only lists contents one level at a time (no recursion).
-            Returns absolute path to the file if found, else None.
-            """
-            current_dir = base_dir
-    
-            for part in path_parts[:-1]:
-                try:
-                    entries = os.listdir(current_dir)
-                except OSError:
-                    return None
-    
-                match = next((e for e in entries if e.lower() == part.lower() and 
-                            os.path.isdir(os.path.join(current_dir, e))), None)
-                if not match:
-                    return None
-                current_dir = os.path.join(current_dir, match)
-    
-            # Last part should be a file (case-insensitive match for .txt)
-            target_file = path_parts[-1]
-            try:
-                entries = os.listdir(current_dir)
-            except OSError:
-                return None
-    
-            for e in entries:
-                base_name, ext = os.path.splitext(e)
-                if ext.lower() == '.txt' and base_name.lower() == target_file.lower():
-                    return os.path.join(current_dir, e)
-    
-            return None
-        
         def replace_match(match):
-            wildcard_name = match.group(1).strip()
-    
-            if wildcard_name.lower().endswith('.txt'):
-                wildcard_name = wildcard_name[:-4]
-    
-            # Normalize separators and split into parts
-            normalized = re.sub(r'[\\/]+', '/', wildcard_name)
-            parts = [p for p in normalized.split('/') if p]
+            parts = wildcard_name_parts(match.group(1))
     
             if not parts:
                 return match.group(0)
+            
+            # Folder pool: '__folder/*__' picks one line across every .txt file directly inside 'folder'
+            if parts[-1] == '*':
+                folder = case_insensitive_resolve_dir(wildcard_dir, parts[:-1])
+                if folder is None:
+                    return match.group(0)
+                try:
+                    return WILDCARD_POOL_INDEX.pick(folder)
+                except Exception as e:
+                    print(f"[SILVER_BasicDynamicPrompts] Error reading wildcard folder {folder}: {e}")
+                    return match.group(0)
     
             # Resolve path case-insensitively
-            filepath = case_insensitive_resolve(wildcard_dir, parts)
-            if not filepath or not os.path.isfile(filepath):
+            filepath = resolve_wildcard(wildcard_dir, match.group(1))
+            if not filepath:
                 return match.group(0)
     
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    file_content = f.read()
-    
-                # Filter lines (ignore empty and comment lines)
-                lines = []
-                for line in file_content.splitlines():
-                    trimmed = line.strip()
-                    if trimmed and not trimmed.startswith('#'):
-                        comment_idx = trimmed.find('#')
-                        if comment_idx != -1:
-                            trimmed = trimmed[:comment_idx].strip()
-                        if trimmed:
-                            lines.append(trimmed)
+                # Valid lines (empty and comment lines ignored) - shared table, the file is only read again once it changed
+                lines = get_wildcard_lines(filepath)
     
                 if not lines:
                     return ""
@@ -380,7 +1006,8 @@ def dynamic_prompts(
                 print(f"Error reading file {filepath}: {e}")
                 return match.group(0)
     
-        return pattern.sub(replace_match, prompt)
+        with wildcard_reads(): # each file and folder is only stat'ed once per pass
+            return pattern.sub(replace_match, prompt)
     
     
     def _process_combinations(prompt: str, seed: int) -> str:
@@ -471,7 +1098,15 @@ def dynamic_prompts(
     
     # --- Main function body: Fix applied here ---
     
-    max_proccess_count = 30
+    # Fail fast on wildcard files that (statically) reference each other in a loop that can never end
+    if "__" in prompt and wildcard_dir:
+        with wildcard_reads():
+            wildcard_dir_stamp = path_stamp(wildcard_dir)
+            if wildcard_dir_stamp is not None and stat.S_ISDIR(wildcard_dir_stamp[0]) and str(Path(wildcard_dir).resolve()) != str(Path(wildcard_dir).anchor):
+                get_wildcard_graph(wildcard_dir).check(prompt)
+    
+    # Both processors re-seed and are deterministic: a pass that leaves the prompt unchanged would do so forever -> stop there
+    max_proccess_count = MAX_PROCESS_PASSES
     while max_proccess_count > 0:
         
         has_wildcards = "__" in prompt
@@ -480,26 +1115,37 @@ def dynamic_prompts(
         if not has_wildcards and not has_combinations:
             break # Exit the loop if no more dynamic content is found
         
+        prompt_before_pass = prompt
+        
         # Process wildcards recursively (NO _fix_prompt call here)
         if has_wildcards:
-            max_subproccess_count = 10
+            max_subproccess_count = MAX_WILDCARD_PASSES
             while max_subproccess_count > 0:
                 if "__" in prompt:
-                    prompt = _process_wildcards(prompt, wildcard_dir, seed)
+                    new_prompt = _process_wildcards(prompt, wildcard_dir, seed)
+                    if new_prompt == prompt:
+                        break # Only unresolvable wildcards are left
+                    prompt = new_prompt
                 else:
                     break
                 max_subproccess_count -= 1
         
         # Process combinations recursively (NO _fix_prompt call here)
         if has_combinations:
-            max_subproccess_count = 30
+            max_subproccess_count = MAX_COMBINATION_PASSES
             while max_subproccess_count > 0:
                 if "{" in prompt or "}" in prompt:
-                    prompt = _process_combinations(prompt, seed)
+                    new_prompt = _process_combinations(prompt, seed)
+                    if new_prompt == prompt:
+                        break # Only unbalanced braces are left
+                    prompt = new_prompt
                 else:
                     break
                 max_subproccess_count -= 1
         
+        if prompt == prompt_before_pass:
+            break
+        
         max_proccess_count -= 1
     
     # 1. FINAL CLEANING: Run _fix_prompt ONCE on the fully resolved string
@@ -536,16 +1182,84 @@ def get_available_loras_stem():
     lora_paths = folder_paths.get_filename_list("loras")
     return [Path(f).stem for f in lora_paths]
 
-def parse_lora_patterns(prompt: str) -> Tuple[List[Lora], List[str], List[str], List[str], List[str]]:
+_last_lora_stem_index: Tuple[List[str], Tuple[StringTable, StringTable]] | None = None # (lora files, tables) of the last call
+
+def get_lora_stem_index() -> Tuple[StringTable, StringTable]:
+    """
+    Shared (see SHARED_INDEX) sorted table of lowercase LoRA stems and the parallel table of their filenames.
+    The first file in 'folder_paths' order wins for duplicated stems.
+    """
+    global _last_lora_stem_index
+    lora_files = folder_paths.get_filename_list("loras")
+    last = _last_lora_stem_index
+    if last is not None and last[0] == lora_files:
+        return last[1] # same list: skip the digest of every filename done by SHARED_INDEX
+    
+    def build():
+        lora_files_by_stem: Dict[str, str] = {}
+        for lora_file in lora_files:
+            lora_files_by_stem.setdefault(Path(lora_file).stem.lower().strip(), lora_file)
+        stems = sorted(lora_files_by_stem)
+        return [stems, [lora_files_by_stem[stem] for stem in stems]]
+    
+    lora_stems, lora_stem_files = SHARED_INDEX.get("loras", "loras", tuple(lora_files), build)
+    _last_lora_stem_index = (list(lora_files), (lora_stems, lora_stem_files))
+    return lora_stems, lora_stem_files
+
+LORA_PREFIXES = r'lora|lora_a|lora_b|lora_visual|lora_a_visual|lora_b_visual|lora_audio|lora_a_audio|lora_b_audio'
+LORA_TAG_PATTERN = re.compile(r'<(' + LORA_PREFIXES + r'):([^>]+)>', re.IGNORECASE)
+LORA_TAG_ARGS_PATTERN = re.compile(r'([^:>]+)(?::(\d+\.?\d*))?(?::(\d+\.?\d*))?', re.IGNORECASE)
+LORA_TAG_STRICT_PATTERN = re.compile(r'<(' + LORA_PREFIXES + r'):([^:>]+)(?::(\d+\.?\d*))?(?::(\d+\.?\d*))?>', re.IGNORECASE)
+
+def scan_lora_tags(prompt: str) -> Tuple[List[str], List[Tuple[str, str, str, str]], str]:
+    """
+    Single pass over the rendered prompt that extracts every lora tag.
+    
+    Returns:
+        all_patterns: every '<prefix:...>' tag found (used for removal and 'loras_names_not_found').
+        matches: (prefix, name, model_weight, clip_weight) for every well-formed tag - same as a findall with LORA_TAG_STRICT_PATTERN.
+        prompt_without_loras: the prompt with every tag removed.
+    """
+    tags = list(LORA_TAG_PATTERN.finditer(prompt))
+    
+    # A '<' inside a tag (ex: '<lora:a<lora:b>') is the only case where the strict pattern can match something other than a whole tag
+    # and where removing a tag can create a new one -> keep the original (slower) behavior for it.
+    if any('<' in tag.group(2) for tag in tags):
+        all_patterns = [tag.group(0) for tag in tags]
+        matches = LORA_TAG_STRICT_PATTERN.findall(prompt)
+        prompt_without_loras = prompt
+        for pattern in all_patterns:
+            prompt_without_loras = prompt_without_loras.replace(pattern, "")
+            prompt_without_loras = prompt_without_loras.replace(pattern.replace(". ", "."), "") # Fix for lora filenames with dots
+        return all_patterns, matches, prompt_without_loras
+    
+    all_patterns = []
+    matches = []
+    kept = []
+    last_end = 0
+    for tag in tags:
+        all_patterns.append(tag.group(0))
+        args = LORA_TAG_ARGS_PATTERN.fullmatch(tag.group(2))
+        if args:
+            matches.append((tag.group(1), args.group(1), args.group(2) or "", args.group(3) or ""))
+        kept.append(prompt[last_end:tag.start()])
+        last_end = tag.end()
+    kept.append(prompt[last_end:])
+    
+    return all_patterns, matches, "".join(kept)
+
+
+def parse_lora_patterns(prompt: str, scanned: Tuple[List[str], List[Tuple[str, str, str, str]], str] | None = None) -> Tuple[List[Lora], List[str], List[str], List[str], List[str]]:
     """
     Finds, extracts, and resolves Lora patterns from a prompt string.
     Handles case-insensitivity and ensures no duplicate Lora paths,
     updating weights if a higher value is encountered.
+    'scanned' may be given when 'scan_lora_tags(prompt)' was already called.
     """
     
     # outputs
     loras_to_load: List[Lora] = []
-    all_patterns = re.findall(r'<(?:lora|lora_a|lora_b|lora_visual|lora_a_visual|lora_b_visual|lora_audio|lora_a_audio|lora_b_audio):[^>]+>', prompt, re.IGNORECASE)
+    all_patterns, matches, _ = scanned if scanned is not None else scan_lora_tags(prompt)
     loras_A_to_load_patterns: List[str] = []
     loras_B_to_load_patterns: List[str] = []
     not_found_lora_names: List[str] = []
@@ -553,10 +1267,11 @@ def parse_lora_patterns(prompt: str) -> Tuple[List[Lora], List[str], List[str],
     lora_A_map: Dict[str, Lora] = {}
     lora_B_map: Dict[str, Lora] = {}
     
-    lora_files = folder_paths.get_filename_list("loras")    
+    lora_stems, lora_stem_files = get_lora_stem_index() if matches else ([], [])
     
-    pattern = r'<(lora|lora_a|lora_b|lora_visual|lora_a_visual|lora_b_visual|lora_audio|lora_a_audio|lora_b_audio):([^:>]+)(?::(\d+\.?\d*))?(?::(\d+\.?\d*))?>'
-    matches = re.findall(pattern, prompt, re.IGNORECASE)
+    def find_lora_file(stem: str) -> str | None:
+        index = lora_stems.find(stem)
+        return lora_stem_files[index] if index >= 0 else None
     
     for prefix, name_in_prompt, model_w_str, clip_w_str in matches:
         load_on_model_A = prefix.lower() in ["lora", "lora_visual", "lora_audio", "lora_a", "lora_a_visual", "lora_a_audio"]
@@ -568,21 +1283,17 @@ def parse_lora_patterns(prompt: str) -> Tuple[List[Lora], List[str], List[str],
         lora_path = ""
         
         # A. Find the matching Lora file
-        for lora_file in lora_files:
-            stem = Path(lora_file).stem
-            if stem.lower().strip() == name_in_prompt.strip().lower():
-                lora_found_name = stem
-                lora_path = folder_paths.get_full_path("loras", lora_file)
-                break
+        lora_file = find_lora_file(name_in_prompt.strip().lower())
+        if lora_file is not None:
+            lora_found_name = Path(lora_file).stem
+            lora_path = folder_paths.get_full_path("loras", lora_file)
         
         # Fix for lora filenames with dots
         if "." in name_in_prompt and not lora_path:
-            for lora_file in lora_files:
-                stem = Path(lora_file).stem
-                if stem.lower().strip() == name_in_prompt.strip().lower().replace(". ", "."):
-                    lora_found_name = stem
-                    lora_path = folder_paths.get_full_path("loras", lora_file)
-                    break
+            lora_file = find_lora_file(name_in_prompt.strip().lower().replace(". ", "."))
+            if lora_file is not None:
+                lora_found_name = Path(lora_file).stem
+                lora_path = folder_paths.get_full_path("loras", lora_file)
         
         # B. Parse Weights
         model_weight = float(model_w_str) if model_w_str else 1.0
@@ -668,10 +1379,127 @@ def parse_lora_patterns(prompt: str) -> Tuple[List[Lora], List[str], List[str],
     
     return loras_to_load, all_patterns, loras_A_to_load_patterns, loras_B_to_load_patterns, not_found_lora_names
 
+class LoraSidecarCache:
+    """
+    Optional on-disk cache of compacted LoRA files (disabled unless LORA_SIDECAR_DIR is set).
+    
+    The first load of a LoRA for a given LoraLoadMode writes a safetensors 'sidecar' that only holds the weights of that mode
+    (visual-only/audio-only) with fp32/fp64 weights cast to LORA_SIDECAR_DTYPE. Later loads read the smaller sidecar instead of the source
+    as long as the source size and mtime stored in the sidecar metadata still match.
+    Note: casting to fp16/bf16 happens before ComfyUI patches the model so results can differ slightly from loading the fp32 source.
+    """
+    DTYPES = {"fp16": torch.float16, "bf16": torch.bfloat16, "keep": None}
+    
+    def __init__(self, directory: str, dtype_name: str):
+        self.directory = directory
+        if dtype_name not in self.DTYPES:
+            print(f"[SILVER_BasicDynamicPrompts] Unknown LoRA sidecar dtype: {dtype_name} - using 'keep'")
+            dtype_name = "keep"
+        self.dtype_name = dtype_name
+        self.dtype = self.DTYPES[dtype_name]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.bytes_saved = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+    
+    def _sidecar_path(self, lora: Lora) -> str:
+        source_hash = hashlib.sha1(os.path.abspath(lora.LoraPath).encode('utf-8', errors='surrogatepass')).hexdigest()[:12]
+        return os.path.join(self.directory, f"{lora.Name}-{source_hash}-{lora.LoadMode.name}-{self.dtype_name}.safetensors")
+    
+    @staticmethod
+    def _source_stamp(lora: Lora) -> Dict[str, str]:
+        st = os.stat(lora.LoraPath)
+        return {"source_size": str(st.st_size), "source_mtime_ns": str(st.st_mtime_ns)}
+    
+    def load(self, lora: Lora) -> dict | None:
+        """
+        Returns the sidecar weights of 'lora' or None when there is no up-to-date sidecar.
+        """
+        if not self.enabled:
+            return None
+        sidecar_path = self._sidecar_path(lora)
+        try:
+            source_stamp = self._source_stamp(lora)
+            with safe_open(sidecar_path, framework="pt") as f:
+                metadata = f.metadata() or {}
+            if any(metadata.get(k) != v for k, v in source_stamp.items()):
+                raise FileNotFoundError(sidecar_path) # stale - rewritten by 'store'
+            weights = load_torch_file(sidecar_path, safe_load=True)
+        except Exception:
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += int(source_stamp["source_size"]) - os.path.getsize(sidecar_path)
+        return weights
+    
+    def store(self, lora: Lora, weights: dict, source_key_count: int) -> dict:
+        """
+        Casts 'weights' (already split for 'lora.LoadMode' out of the 'source_key_count' tensors of the source) to the configured dtype,
+        writes them as the sidecar of 'lora' and returns the cast weights so the first load behaves exactly like the following ones.
+        """
+        if not self.enabled:
+            return weights
+        
+        compact = {}
+        for key, tensor in weights.items():
+            if self.dtype is not None and tensor.dtype in (torch.float32, torch.float64):
+                tensor = tensor.to(self.dtype)
+            compact[key] = tensor.contiguous()
+        
+        # Nothing removed and nothing cast (whatever the load mode) -> a sidecar would only duplicate the source
+        if len(compact) == 0 or (len(compact) == source_key_count and all(compact[k].dtype == weights[k].dtype for k in compact)):
+            return compact
+        
+        sidecar_path = self._sidecar_path(lora)
+        tmp_path = f"{sidecar_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            metadata = self._source_stamp(lora)
+            metadata["source_path"] = os.path.abspath(lora.LoraPath)
+            save_file(compact, tmp_path, metadata=metadata)
+            os.replace(tmp_path, sidecar_path)
+            with self._lock:
+                self.writes += 1
+        except Exception as e:
+            print(f"[SILVER_BasicDynamicPrompts] WARNING: Failed to write LoRA sidecar for: {lora.Name} ({e})")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        return compact
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "directory": self.directory,
+                "dtype": self.dtype_name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "bytes_saved": self.bytes_saved,
+            }
+
+
+LORA_SIDECAR_CACHE = LoraSidecarCache(LORA_SIDECAR_DIR, LORA_SIDECAR_DTYPE)
+
+
 def get_lora_state_dict(lora: Lora):
+    sidecar_weights = LORA_SIDECAR_CACHE.load(lora)
+    if sidecar_weights is not None:
+        return sidecar_weights
+    
     lora_weights = load_torch_file(lora.LoraPath, safe_load=True)
     if lora.LoadMode == LoraLoadMode.Default:
-        return lora_weights
+        return LORA_SIDECAR_CACHE.store(lora, lora_weights, len(lora_weights))
     else:
         audio_weights = {}
         visual_weights = {}
@@ -680,7 +1508,104 @@ def get_lora_state_dict(lora: Lora):
                 audio_weights[key] = tensor
             else:
                 visual_weights[key] = tensor
-        return visual_weights if lora.LoadMode == LoraLoadMode.VisualOnly else audio_weights
+        return LORA_SIDECAR_CACHE.store(lora, visual_weights if lora.LoadMode == LoraLoadMode.VisualOnly else audio_weights, len(lora_weights))
+
+
+def lora_list_stamp() -> int:
+    return hash(tuple(folder_paths.get_filename_list("loras")))
+
+
+class ResolvedPromptCache:
+    """
+    Bounded LRU cache of fully resolved node outputs (final prompt, loras, lora patterns and not-found names).
+    Keys include the template, seed and every cleaning option. Each entry also keeps the stamps of the wildcard files and folders read
+    while resolving it (see 'wildcard_reads') and, when the prompt had LoRA tags, the LoRA list stamp - all checked again on every hit:
+    re-submitting the same job costs a dictionary lookup plus one stat per file it used, while editing, adding or removing one of those
+    wildcard files (or any LoRA file for prompts with LoRA tags) misses.
+    """
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not (stamps_unchanged(entry[1]) and (entry[2] is None or entry[2] == lora_list_stamp())):
+                del self._entries[key] # a wildcard file or folder it was resolved from (or the LoRA list) changed
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, value, stamps: Dict[str, tuple] | None = None, loras_stamp: int | None = None):
+        with self._lock:
+            self._entries[key] = (value, tuple(stamps.items()) if stamps else (), loras_stamp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+            }
+
+
+RESOLVED_PROMPT_CACHE = ResolvedPromptCache()
+
+
+def resolve_prompt(prompt: str, seed: int, line_suffix: str, single_line_output: bool, remove_whitespaces: bool, remove_empty_tags: bool, remove_loras_pattern: bool, wildcard_dir: str) -> Tuple[str, List[Lora], List[str], List[str], List[str], List[str]]:
+    """
+    Runs 'dynamic_prompts' and 'parse_lora_patterns' (and the lora pattern removal pass when 'remove_loras_pattern' is True).
+    Results are memoized in RESOLVED_PROMPT_CACHE. Returned lists and Lora objects are fresh copies the caller may modify.
+    
+    Returns:
+        (prompt, loras_to_load, all_patterns, loras_A_to_load_patterns, loras_B_to_load_patterns, not_found_lora_names)
+    """
+    key = (
+        prompt, seed, line_suffix, single_line_output, remove_whitespaces, remove_empty_tags, remove_loras_pattern, wildcard_dir,
+    )
+    
+    cached = RESOLVED_PROMPT_CACHE.get(key)
+    if cached is None:
+        with wildcard_reads() as reads:
+            dp = dynamic_prompts(prompt = prompt, seed = seed, line_suffix = line_suffix, single_line_output = single_line_output, remove_whitespaces = remove_whitespaces, remove_empty_tags = remove_empty_tags, wildcard_dir = wildcard_dir)
+            
+            # One scan gives both the lora tags and the lora-free prompt - only prompts with lora tags depend on the LoRA list
+            scanned = scan_lora_tags(dp)
+            loras_stamp = lora_list_stamp() if scanned[1] else None
+            loras_to_load, all_patterns, loras_A_to_load_patterns, loras_B_to_load_patterns, not_found_lora_names = parse_lora_patterns(dp, scanned)
+            
+            if remove_loras_pattern and len(all_patterns) > 0:
+                dp = scanned[2]
+                if remove_whitespaces or remove_empty_tags:
+                    if "__" in dp or "{" in dp or "}" in dp:
+                        # Unresolved dynamic content is left (missing wildcard file, unbalanced braces ...) -> the full pipeline handles it as before
+                        dp = dynamic_prompts(prompt = dp, seed = seed, line_suffix = line_suffix, single_line_output = single_line_output, remove_whitespaces = remove_whitespaces, remove_empty_tags = remove_empty_tags, wildcard_dir = wildcard_dir)
+                    else:
+                        # Only re-clean the gaps left by the removed tags
+                        dp = _fix_prompt(prompt = dp, line_suffix = line_suffix, single_line_output = single_line_output, remove_whitespaces = remove_whitespaces, remove_empty_tags = remove_empty_tags)
+        
+        cached = (dp, tuple(loras_to_load), tuple(all_patterns), tuple(loras_A_to_load_patterns), tuple(loras_B_to_load_patterns), tuple(not_found_lora_names))
+        RESOLVED_PROMPT_CACHE.put(key, cached, reads, loras_stamp)
+    
+    dp, loras_to_load, all_patterns, loras_A_to_load_patterns, loras_B_to_load_patterns, not_found_lora_names = cached
+    return dp, [copy.copy(lora) for lora in loras_to_load], list(all_patterns), list(loras_A_to_load_patterns), list(loras_B_to_load_patterns), list(not_found_lora_names)
 
 
 class SILVER_BasicDynamicPrompts:    
@@ -736,9 +1661,10 @@ wildcard_directory: The directory where TXT wildcard files are stored.
 
     def main(self, seed, line_suffix, single_line_output, remove_whitespaces, remove_empty_tags, load_loras_from_prompt, remove_loras_pattern, wildcard_directory, model_A_optional=None, clip_A_optional=None, model_B_optional=None, clip_B_optional=None, prompt=DEFAULT_PROMPT):
         
-        dp = dynamic_prompts(prompt = prompt, seed = seed, line_suffix = line_suffix, single_line_output = single_line_output, remove_whitespaces = remove_whitespaces, remove_empty_tags = remove_empty_tags, wildcard_dir = wildcard_directory)
-        
-        loras_to_load, all_patterns, loras_A_to_load_patterns, loras_B_to_load_patterns, not_found_lora_names = parse_lora_patterns(dp)
+        dp, loras_to_load, all_patterns, loras_A_to_load_patterns, loras_B_to_load_patterns, not_found_lora_names = resolve_prompt(
+            prompt = prompt, seed = seed, line_suffix = line_suffix, single_line_output = single_line_output, remove_whitespaces = remove_whitespaces,
+            remove_empty_tags = remove_empty_tags, remove_loras_pattern = remove_loras_pattern, wildcard_dir = wildcard_directory
+        )
         
         if load_loras_from_prompt and (model_A_optional or clip_A_optional or model_B_optional or clip_B_optional):
             for lora in loras_to_load:
@@ -766,31 +1692,81 @@ wildcard_directory: The directory where TXT wildcard files are stored.
         loaded_lora_patterns_B = ', '.join(loras_B_to_load_patterns)
         loras_names_not_found = ', '.join(not_found_lora_names)
         
-        if remove_loras_pattern and len(all_patterns) > 0:
-            for pattern in all_patterns:
-                dp = dp.replace(pattern, "")
-                dp = dp.replace(pattern.replace(". ", "."), "") # Fix for lora filenames with dots
-            if remove_whitespaces or remove_empty_tags:
-                dp = dynamic_prompts(prompt = dp, seed = seed, line_suffix = line_suffix, single_line_output = single_line_output, remove_whitespaces = remove_whitespaces, remove_empty_tags = remove_empty_tags, wildcard_dir = wildcard_directory)
-        
         return (model_A_optional, clip_A_optional, model_B_optional, clip_B_optional, dp, prompt, loaded_lora_patterns_A, loaded_lora_patterns_B, loras_names_not_found)
 
 
 
-@PromptServer.instance.routes.post("/silver_basicdynamicprompts/get_available_loras")
-async def get_available_loras(request):
-    data = await request.json()
-    available_loras = get_available_loras_stem()
-    return web.json_response({"available_loras": available_loras})
+# --- Route helpers ---
+# Every filesystem scan and subprocess call made by the routes below runs on the default executor so that
+# ComfyUI's event loop (websocket progress feed, queue, other routes) never stalls while they are working.
 
+ROUTE_IO_TIMEOUT = 10.0 # seconds a route waits for its executor job before giving up
+LAUNCHER_TIMEOUT = 5.0  # seconds given to 'dbus-send' before falling back to 'xdg-open'
 
-@PromptServer.instance.routes.post("/silver_basicdynamicprompts/get_wildcard_files")
-async def get_wildcard_files(request):
-    data = await request.json()
-    current_wildcard_dir = data.get("current_wildcard_dir", "")
-    if not current_wildcard_dir:
-        return web.json_response({"wildcard_files": []})
+
+async def run_blocking(func, *args, timeout: float = ROUTE_IO_TIMEOUT):
+    """
+    Runs a blocking callable on the default executor and awaits its result with a timeout.
+    Raises asyncio.TimeoutError when the job does not finish in time (the worker thread is left to finish on its own).
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(loop.run_in_executor(None, func, *args), timeout=timeout)
+
+
+def fire_and_forget(func, *args):
+    """
+    Schedules a blocking callable on the default executor without awaiting it.
+    Used for launcher processes (explorer, xdg-open, ...) whose outcome the client does not need.
+    """
+    def _job():
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"[SILVER_BasicDynamicPrompts] Launcher error in {getattr(func, '__name__', func)}: {e}")
     
+    asyncio.get_running_loop().run_in_executor(None, _job)
+
+
+def spawn_detached(args: List[str]):
+    """
+    Starts a process without waiting for it. Its output is discarded.
+    """
+    subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=(os.name != 'nt'))
+
+
+def open_with_default_app(file_path: str):
+    if os.name == 'nt': # Windows
+        os.startfile(file_path)
+    elif os.uname().sysname == 'Darwin': # macOS
+        spawn_detached(['open', file_path])
+    else: # Linux and others
+        spawn_detached(['xdg-open', file_path])
+
+
+def reveal_in_file_manager(file_path: str):
+    if os.name == 'nt': # Windows
+        # /select, allows highlighting the file in a new explorer window
+        spawn_detached(['explorer', '/select,', os.path.normpath(file_path)])
+    elif os.uname().sysname == 'Darwin': # macOS
+        spawn_detached(['open', '-R', file_path])
+    else: # Linux and others
+        try:
+            # This is the most standard way to "select" a file on modern Linux distros
+            subprocess.run([
+                'dbus-send', '--session', '--dest=org.freedesktop.FileManager1', '--type=method_call',
+                '/org/freedesktop/FileManager1', 'org.freedesktop.FileManager1.ShowItems',
+                f'array:string:"file://{os.path.abspath(file_path)}"', 'string:""'
+            ], check=True, timeout=LAUNCHER_TIMEOUT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception:
+            # Fallback to just opening the directory if dbus fails
+            spawn_detached(['xdg-open', os.path.dirname(file_path)])
+
+
+def scan_wildcard_files(current_wildcard_dir: str) -> List[str]:
+    """
+    Lists every .txt file (up to 4 nested subfolders) of 'current_wildcard_dir' as lowercase relative paths without extension.
+    Each entry is also added with its '.txt' extension for __filename.txt__ support.
+    """
     wildcard_files = []
     wildcard_path = Path(current_wildcard_dir)
     if current_wildcard_dir and wildcard_path.exists() and wildcard_path.is_dir() and (str(wildcard_path.resolve()) != str(wildcard_path.anchor)): # ignore cases like 'C:\'
@@ -803,35 +1779,224 @@ async def get_wildcard_files(request):
                 dirs.clear() # Clear the 'dirs' list to prevent os.walk from descending into subdirectories of the current 'root' folder.
                 continue # Skip processing files in this folder
             
+            if any(file.lower().endswith(".txt") for file in files):
+                wildcard_files.append(str(relative_path / "*").lower()) # folder pool: __folder/*__
+            
             for file in files:
-                if file.endswith(".txt"):
+                if file.lower().endswith(".txt"): # same as wildcard resolution and folder pools
                     full_file_path = Path(root) / file
                     relative_file_path = full_file_path.relative_to(wildcard_path) # Determine the relative path of the file inside current_wildcard_dir. The Path.relative_to() method is perfect for this.
                     relative_path_no_ext = relative_file_path.parent / relative_file_path.stem
                     wildcard_files.append(str(relative_path_no_ext).lower())
                     wildcard_files.append(str(relative_path_no_ext).lower() + ".txt") # fast way to add support for: __filename.txt__
     
+    return wildcard_files
+
+
+def find_lora_location(lora_name: str) -> str | None:
+    available_loras = folder_paths.get_filename_list("loras")
+    matched_filename = next((f for f in available_loras if Path(f).stem == lora_name), None)
+    if matched_filename is None:
+        return None
+    lora_location = folder_paths.get_full_path("loras", matched_filename)
+    if not lora_location or not os.path.exists(lora_location):
+        return None
+    return lora_location
+
+
+class EditorDataSync:
+    """
+    Keeps a versioned copy of the LoRA stem list and of the wildcard files of every wildcard directory used by an editor.
+    Editors get everything once through the 'bootstrap' route and are then kept up to date with add/remove deltas
+    pushed over the PromptServer websocket by a background polling thread.
+    A wildcard directory stays watched for WATCH_TTL seconds after the last bootstrap asking for it (at most MAX_WATCHED_DIRS,
+    least recently requested dropped first) - editors that still use a dropped directory simply bootstrap it again.
+    
+    Events:
+        silver_basicdynamicprompts.loras_delta     -> {"version", "added", "removed"}
+        silver_basicdynamicprompts.wildcards_delta -> {"wildcard_dir", "version", "added", "removed"} or {"wildcard_dir", "dropped": true}
+    """
+    POLL_INTERVAL = 5.0 # seconds between rescans of the LoRA folders and watched wildcard directories
+    WATCH_TTL = 600.0
+    MAX_WATCHED_DIRS = 32
+    LORAS_EVENT = "silver_basicdynamicprompts.loras_delta"
+    WILDCARDS_EVENT = "silver_basicdynamicprompts.wildcards_delta"
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._thread = None
+        self.lora_version = 0
+        self.loras: set = set()
+        self.loras_loaded = False
+        self.wildcards: Dict[str, Tuple[int, set]] = {} # wildcard_dir -> (version, files)
+        self.requested: OrderedDict[str, float] = OrderedDict() # wildcard_dir -> time of the last bootstrap asking for it (oldest first)
+    
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll_loop, name="SILVER_BasicDynamicPrompts_sync", daemon=True)
+            self._thread.start()
+    
+    def _poll_loop(self):
+        while True:
+            time.sleep(self.POLL_INTERVAL)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[SILVER_BasicDynamicPrompts] Editor data sync error: {e}")
+    
+    def _refresh_loras(self) -> dict | None:
+        current = set(get_available_loras_stem())
+        with self._lock:
+            if not self.loras_loaded:
+                self.loras, self.loras_loaded = current, True
+                return None
+            added, removed = current - self.loras, self.loras - current
+            if not added and not removed:
+                return None
+            self.loras = current
+            self.lora_version += 1
+            return {"version": self.lora_version, "added": sorted(added), "removed": sorted(removed)}
+    
+    def _refresh_wildcard_dir(self, wildcard_dir: str) -> dict | None:
+        current = set(scan_wildcard_files(wildcard_dir))
+        with self._lock:
+            if wildcard_dir not in self.requested:
+                return None # dropped while scanning
+            if wildcard_dir not in self.wildcards:
+                self.wildcards[wildcard_dir] = (0, current)
+                return None
+            version, files = self.wildcards[wildcard_dir]
+            added, removed = current - files, files - current
+            if not added and not removed:
+                return None
+            self.wildcards[wildcard_dir] = (version + 1, current)
+            return {"wildcard_dir": wildcard_dir, "version": version + 1, "added": sorted(added), "removed": sorted(removed)}
+    
+    def _drop_unrequested(self):
+        """
+        Stops watching the wildcard directories nobody asked for since WATCH_TTL seconds, then the oldest ones above MAX_WATCHED_DIRS.
+        """
+        with self._lock:
+            dropped = []
+            now = time.monotonic()
+            while self.requested:
+                wildcard_dir, requested_at = next(iter(self.requested.items()))
+                if now - requested_at <= self.WATCH_TTL and len(self.requested) <= self.MAX_WATCHED_DIRS:
+                    break
+                self.requested.popitem(last=False)
+                self.wildcards.pop(wildcard_dir, None)
+                dropped.append(wildcard_dir)
+        for wildcard_dir in dropped:
+            PromptServer.instance.send_sync(self.WILDCARDS_EVENT, {"wildcard_dir": wildcard_dir, "dropped": True})
+    
+    def refresh(self):
+        """
+        Rescans the LoRA folders and every watched wildcard directory and pushes a delta for each one that changed.
+        """
+        delta = self._refresh_loras()
+        if delta is not None:
+            PromptServer.instance.send_sync(self.LORAS_EVENT, delta)
+        
+        self._drop_unrequested()
+        with self._lock:
+            watched = list(self.wildcards.keys())
+        for wildcard_dir in watched:
+            delta = self._refresh_wildcard_dir(wildcard_dir)
+            if delta is not None:
+                PromptServer.instance.send_sync(self.WILDCARDS_EVENT, delta)
+    
+    def bootstrap(self, wildcard_dirs: List[str]) -> dict:
+        """
+        Returns the full LoRA list and the files of the requested wildcard directories along with their versions.
+        Requested wildcard directories are watched from now on.
+        """
+        self._ensure_started()
+        if not self.loras_loaded:
+            self._refresh_loras()
+        for wildcard_dir in wildcard_dirs:
+            if not wildcard_dir:
+                continue
+            with self._lock:
+                self.requested[wildcard_dir] = time.monotonic()
+                self.requested.move_to_end(wildcard_dir)
+                watched = wildcard_dir in self.wildcards
+            if not watched:
+                self._refresh_wildcard_dir(wildcard_dir)
+        self._drop_unrequested()
+        
+        with self._lock:
+            return {
+                "loras": {"version": self.lora_version, "items": sorted(self.loras)},
+                "wildcards": {
+                    d: {"version": self.wildcards[d][0], "items": sorted(self.wildcards[d][1])}
+                    for d in wildcard_dirs if d in self.wildcards
+                },
+            }
+
+
+EDITOR_DATA_SYNC = EditorDataSync()
+
+
+@PromptServer.instance.routes.post("/silver_basicdynamicprompts/bootstrap")
+async def bootstrap_editor_data(request):
+    data = await request.json()
+    wildcard_dirs = [d for d in data.get("wildcard_dirs", []) if isinstance(d, str) and d]
+    try:
+        payload = await run_blocking(EDITOR_DATA_SYNC.bootstrap, wildcard_dirs)
+    except asyncio.TimeoutError:
+        print("[SILVER_BasicDynamicPrompts] Timed out while building the editor bootstrap payload")
+        return web.json_response({"error": "timeout"}, status=504)
+    return web.json_response(payload)
+
+
+@PromptServer.instance.routes.post("/silver_basicdynamicprompts/get_available_loras")
+async def get_available_loras(request):
+    data = await request.json()
+    try:
+        available_loras = await run_blocking(get_available_loras_stem)
+    except asyncio.TimeoutError:
+        print("[SILVER_BasicDynamicPrompts] Timed out while listing available loras")
+        return web.json_response({"available_loras": [], "error": "timeout"}, status=504)
+    return web.json_response({"available_loras": available_loras})
+
+
+@PromptServer.instance.routes.post("/silver_basicdynamicprompts/get_wildcard_files")
+async def get_wildcard_files(request):
+    data = await request.json()
+    current_wildcard_dir = data.get("current_wildcard_dir", "")
+    if not current_wildcard_dir:
+        return web.json_response({"wildcard_files": []})
+    
+    try:
+        wildcard_files = await run_blocking(scan_wildcard_files, current_wildcard_dir)
+    except asyncio.TimeoutError:
+        print(f"[SILVER_BasicDynamicPrompts] Timed out while scanning wildcard_directory: {current_wildcard_dir}")
+        return web.json_response({"wildcard_files": [], "error": "timeout"}, status=504)
+    
     return web.json_response({"wildcard_files": wildcard_files})
 
 
+@PromptServer.instance.routes.get("/silver_basicdynamicprompts/cache_stats")
+async def get_cache_stats(request):
+    return web.json_response({"resolved_prompts": RESOLVED_PROMPT_CACHE.stats(), "shared_index": SHARED_INDEX.stats(), "lora_sidecars": LORA_SIDECAR_CACHE.stats()})
+
+
 @PromptServer.instance.routes.post("/silver_basicdynamicprompts/quick_open_wildcard")
 async def quick_open_wildcard(request):
     try:
         data = await request.json()
         file_path = data.get("file_path")
         
-        if not file_path or not os.path.exists(file_path):
+        if not file_path or not await run_blocking(os.path.exists, file_path):
             return web.json_response({"success": False, "error": f"File not found: {file_path}"})
         
-        if os.name == 'nt': # Windows
-            os.startfile(file_path)
-        elif os.uname().sysname == 'Darwin': # macOS
-            subprocess.call(('open', file_path))
-        else: # Linux and others
-            subprocess.call(('xdg-open', file_path))
+        fire_and_forget(open_with_default_app, file_path)
             
         return web.json_response({"success": True})
     
+    except asyncio.TimeoutError:
+        print("Error in quick_open_wildcard: timed out")
+        return web.json_response({"success": False, "error": "timeout"}, status=504)
     except Exception as e:
         print(f"Error in quick_open_wildcard: {e}")
         return web.json_response({"success": False, "error": str(e)}, status=500)
@@ -842,42 +2007,23 @@ async def quick_open_lora_location(request):
         data = await request.json()
         lora_name = data.get("lora_name")
         
-        available_loras = folder_paths.get_filename_list("loras")
-        matched_filename = next((f for f in available_loras if Path(f).stem == lora_name), None)
-        
-        if matched_filename is None:
+        lora_location = await run_blocking(find_lora_location, lora_name)
+        if lora_location is None:
             return web.json_response({"success": False, "error": f"LoRA not found: {lora_name}"}, status=500)
         
-        lora_location = folder_paths.get_full_path("loras", matched_filename)
-        if not lora_location or not os.path.exists(lora_location):
-            return web.json_response({"success": False, "error": f"LoRA not found: {lora_location}"}, status=500)
-        
-        if os.name == 'nt': # Windows
-            # /select, allows highlighting the file in a new explorer window
-            subprocess.run(['explorer', '/select,', os.path.normpath(lora_location)])
-        elif os.uname().sysname == 'Darwin': # macOS
-            subprocess.run(['open', '-R', lora_location])
-        else: # Linux and others
-            try:
-                # This is the most standard way to "select" a file on modern Linux distros
-                subprocess.run([
-                    'dbus-send', '--session', '--dest=org.freedesktop.FileManager1', '--type=method_call',
-                    '/org/freedesktop/FileManager1', 'org.freedesktop.FileManager1.ShowItems',
-                    f'array:string:"file://{os.path.abspath(lora_location)}"', 'string:""'
-                ], check=True)
-            except Exception:
-                # Fallback to just opening the directory if dbus fails
-                subprocess.run(['xdg-open', os.path.dirname(lora_location)])
+        fire_and_forget(reveal_in_file_manager, lora_location)
             
         return web.json_response({"success": True})
     
+    except asyncio.TimeoutError:
+        print("Error in quick_open_lora_location: timed out")
+        return web.json_response({"success": False, "error": "timeout"}, status=504)
     except Exception as e:
         print(f"Error in quick_open_lora_location: {e}")
         return web.json_response({"success": False, "error": str(e)}, status=500)
 
 
 
-
 NODE_CLASS_MAPPINGS = {
     "SILVER_BasicDynamicPrompts": SILVER_BasicDynamicPrompts,
 }
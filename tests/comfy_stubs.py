@@ -0,0 +1,56 @@
+"""
+Minimal stubs of the ComfyUI host modules (folder_paths, comfy.sd, comfy.utils, server) - installed when this module is imported.
+
+Kept out of 'conftest.py' so processes spawned by the tests (which never load the conftest) can import it before 'nodes'.
+"""
+import os
+import sys
+import types
+
+from aiohttp import web
+from safetensors.torch import load_file
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LORA_DIR = os.path.join(REPO_DIR, "tests", "loras") # never read - tests do not load LoRA weights
+LORA_FILES = [
+    "Foo.Bar.safetensors",
+    "styleX.safetensors",
+    "sub/Detail.v2.safetensors",
+    "sub/dup.safetensors",
+    "dup.ckpt",
+    "Some Name.safetensors",
+]
+
+
+class _PromptServer:
+    def __init__(self):
+        self.routes = web.RouteTableDef()
+        self.sent = [] # (event, data) pushed with 'send_sync'
+    
+    def send_sync(self, event, data, sid=None):
+        self.sent.append((event, data))
+
+
+def _install_stubs():
+    folder_paths = types.ModuleType("folder_paths")
+    folder_paths.get_filename_list = lambda folder_name: list(LORA_FILES) if folder_name == "loras" else []
+    folder_paths.get_full_path = lambda folder_name, filename: os.path.join(LORA_DIR, filename)
+    
+    comfy = types.ModuleType("comfy")
+    comfy_sd = types.ModuleType("comfy.sd")
+    comfy_sd.load_lora_for_models = lambda model, clip, lora, strength_model, strength_clip: (model, clip)
+    comfy_utils = types.ModuleType("comfy.utils")
+    comfy_utils.load_torch_file = lambda ckpt, safe_load=False, device=None: load_file(ckpt)
+    comfy.sd, comfy.utils = comfy_sd, comfy_utils
+    
+    server = types.ModuleType("server")
+    server.PromptServer = type("PromptServer", (), {"instance": _PromptServer()})
+    
+    sys.modules.update({"folder_paths": folder_paths, "comfy": comfy, "comfy.sd": comfy_sd, "comfy.utils": comfy_utils, "server": server})
+
+
+if "folder_paths" not in sys.modules:
+    _install_stubs()
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
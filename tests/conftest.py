@@ -0,0 +1,57 @@
+"""
+Test setup.
+
+The node normally runs inside ComfyUI: its host modules (folder_paths, comfy.sd, comfy.utils, server) are replaced by minimal stubs ('comfy_stubs.py')
+so the tests run from a plain checkout with only the pip dependencies installed (torch, safetensors, aiohttp, requests).
+ComfyUI only imports the package '__init__.py', this folder is never loaded by it.
+"""
+import os
+
+import pytest
+
+import comfy_stubs # noqa: F401 - installs the host module stubs before anything imports 'nodes'
+
+
+WILDCARD_FILES = {
+    "colors.txt": "# colors\nred\nblue # sky\n{green|dark green}\n__Sub/Animal__ colored\n\n0.5::pink\n",
+    "empty.txt": "# nothing here\n\n",
+    "weights.txt": "{0.3::soft|2::hard|0::never}\n{|glossy}\n",
+    "self.txt": "plain\n{x|__self__ again}\n",
+    "Sub/Animal.txt": "cat\ndog, __colors__\n{bird|fish}\n",
+    "nested/deep/leaf.txt": "leaf __WEIGHTS__\n<lora:styleX:0.8>\n",
+    "loras.txt": "<lora:Foo.Bar:0.5>\n<lora_b:foo. bar:1.2:0.4>\n<lora_a_visual:Detail.v2>\n",
+}
+
+
+@pytest.fixture(scope="session")
+def wildcard_dir(tmp_path_factory):
+    root = tmp_path_factory.mktemp("wildcards")
+    for relative, content in WILDCARD_FILES.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    return str(root)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def shared_index(tmp_path_factory):
+    # Keep the shared tables of the tests away from the per-user folder of a real install
+    import nodes
+    store = nodes.SharedIndexStore(str(tmp_path_factory.mktemp("shared_index")))
+    previous, nodes.SHARED_INDEX = nodes.SHARED_INDEX, store
+    yield store
+    nodes.SHARED_INDEX = previous
+
+
+@pytest.fixture
+def write_later():
+    """
+    Writes a file with an mtime (file and parent folder) one second after the previous one, so stamp based caches see the
+    change whatever the timestamp granularity of the file system.
+    """
+    def write(path, content: str):
+        previous = {p: os.stat(p).st_mtime_ns for p in (path, path.parent) if p.exists()}
+        path.write_text(content, encoding="utf-8")
+        for p, mtime in previous.items():
+            os.utime(p, ns=(mtime + 10**9, mtime + 10**9))
+    return write
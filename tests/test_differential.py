@@ -0,0 +1,257 @@
+"""
+Differential tests against the frozen reference engine ('reference_nodes.py': the node as it was before the performance work).
+
+Randomized templates are resolved by both engines over many seeds and must give byte-for-byte identical outputs, since workflows
+rely on seed reproducibility.
+
+Each case is also timed on a large setup (thousands of LoRAs, large wildcard files and a large folder pool) and its speedup over the
+reference is compared with the committed per-case baseline ('speedup_baseline.json'): a case more than SPEEDUP_TOLERANCE below
+its baseline fails the run. 'SILVER_BDP_RECORD_SPEEDUP=1' writes the measured speedups to the baseline file instead.
+"""
+import json
+import math
+import os
+import random
+import shutil
+import time
+
+import pytest
+
+import comfy_stubs
+import nodes
+import reference_nodes
+
+
+TEMPLATES_PER_CASE = int(os.environ.get("SILVER_BDP_TEST_TEMPLATES", "40"))
+SEEDS_PER_TEMPLATE = int(os.environ.get("SILVER_BDP_TEST_SEEDS", "10"))
+SPEEDUP_TOLERANCE = float(os.environ.get("SILVER_BDP_SPEEDUP_TOLERANCE", "0.7"))
+RECORD_SPEEDUP = os.environ.get("SILVER_BDP_RECORD_SPEEDUP") == "1"
+SPEEDUP_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "speedup_baseline.json")
+TIMING_REPEATS = 3
+MIN_TIMED_SECONDS = 0.5 # the runs of a case are repeated until the reference engine needs at least that long
+BENCHMARK_TEMPLATES, BENCHMARK_SEEDS = 20, 5
+BENCHMARK_LORAS = 5000
+LARGE_FILE_LINES = 20_000
+POOL_FILES, POOL_FILE_LINES = 4, 5_000
+
+WORDS = ["cat", "dog", "red hair", "masterpiece", "1girl", "(smile:1.2)", "[blurry]", "blue.sky", "night", "x"]
+SEPARATORS = [" ", ", ", ",", ".", " , ", ",,", ". ,", "  ", "\n", "\n\n", " .", "|"]
+WILDCARDS = ["__colors__", "__COLORS.txt__", "__Sub/Animal__", "__sub\\animal__", "__missing__", "__empty__", "__weights__",
+             "__self__", "__nested/deep/leaf__", "__Nested\\Deep\\LEAF.TXT__", "__loras__", "__ colors __", "__sub/__", "____"]
+LORA_PREFIXES = ["lora", "LORA", "lora_a", "lora_b", "lora_visual", "lora_a_visual", "lora_b_audio", "Lora_Audio"]
+LORA_NAMES = ["Foo.Bar", "foo. bar", "FOO.BAR", "styleX", "stylex ", "Detail.v2", "detail. v2", "dup", "Some Name", "missing.lora", "nope"]
+LORA_WEIGHTS = ["", ":0.5", ":1", ":2.", ":1.25:0", ":0:0.75", ":abc"]
+WEIGHTS = ["0.3::", "2::", "0::", "0.0::", "1.5::", "0.5 ::", ""]
+
+# Large setup of the timed runs: the reference engine has no folder pools, its runs read the same lines from one concatenated file
+BENCHMARK_WILDCARDS = WILDCARDS + ["__large__", "__LARGE.txt__", "__pool/*__"]
+BENCHMARK_LORA_FILES = [f"library/style{i:04d}.safetensors" for i in range(BENCHMARK_LORAS)]
+BENCHMARK_LORA_NAMES = LORA_NAMES + ["style0042", "STYLE4999", "style2500", "style9999"]
+REFERENCE_POOL, REFERENCE_POOL_FILE = "__pool/*__", "__poolconcatenated__"
+
+CASES = {
+    "combinations": {"combinations", "weights"},
+    "comments":     {"combinations", "comments"},
+    "wildcards":    {"wildcards", "combinations"},
+    "loras":        {"loras", "combinations"},
+    "mixed":        {"combinations", "weights", "comments", "wildcards", "loras"},
+}
+
+
+class TemplateGenerator:
+    """
+    Builds random templates out of the syntax enabled by 'features' (nested combinations, N:: weights, comments, wildcards, LoRA tags).
+    """
+    def __init__(self, rng: random.Random, features: set, wildcards: list = WILDCARDS, lora_names: list = LORA_NAMES):
+        self.rng = rng
+        self.features = features
+        self.wildcards = wildcards
+        self.lora_names = lora_names
+    
+    def lora_tag(self) -> str:
+        return f"<{self.rng.choice(LORA_PREFIXES)}:{self.rng.choice(self.lora_names)}{self.rng.choice(LORA_WEIGHTS)}>"
+    
+    def fragment(self, depth: int) -> str:
+        kinds = ["word", "word", "separator"]
+        if "combinations" in self.features and depth < 3:
+            kinds.append("combination")
+        if "wildcards" in self.features:
+            kinds.append("wildcard")
+        if "loras" in self.features:
+            kinds.append("lora")
+        kind = self.rng.choice(kinds)
+        if kind == "word":
+            return self.rng.choice(WORDS)
+        if kind == "separator":
+            return self.rng.choice(SEPARATORS[:-1] if depth == 0 else SEPARATORS)
+        if kind == "wildcard":
+            return self.rng.choice(self.wildcards)
+        if kind == "lora":
+            return self.lora_tag()
+        
+        choices = []
+        for _ in range(self.rng.randint(1, 4)):
+            weight = self.rng.choice(WEIGHTS) if "weights" in self.features else ""
+            choices.append(weight + "".join(self.fragment(depth + 1) for _ in range(self.rng.randint(0, 3))))
+        return "{" + "|".join(choices) + "}"
+    
+    def template(self) -> str:
+        lines = []
+        for _ in range(self.rng.randint(1, 4)):
+            line = "".join(self.fragment(0) for _ in range(self.rng.randint(1, 6)))
+            if "comments" in self.features and self.rng.random() < 0.4:
+                line += " # " + "".join(self.fragment(0) for _ in range(self.rng.randint(0, 3)))
+            if "comments" in self.features and self.rng.random() < 0.15:
+                line = "# " + line
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def node_options(rng: random.Random, wildcard_dir: str) -> dict:
+    return dict(
+        line_suffix=rng.choice(["", ",", ".", " x"]),
+        single_line_output=rng.random() < 0.7,
+        remove_whitespaces=rng.random() < 0.7,
+        remove_empty_tags=rng.random() < 0.7,
+        load_loras_from_prompt=True,
+        remove_loras_pattern=rng.random() < 0.7,
+        wildcard_directory=wildcard_dir,
+    )
+
+
+def outcome(func, *args, **kwargs):
+    """
+    Result of the call, or the exception type when it raises (ex: combinations whose weights are all 0) - both engines must agree on it.
+    """
+    try:
+        return func(*args, **kwargs)
+    except Exception as e:
+        return type(e)
+
+
+def lora_summary(parsed) -> tuple:
+    loras, *patterns = parsed
+    return [(l.Name, l.PromptName, l.LoraPath, l.ModelWeight, l.ClipWeight, l.LoadOnModel_A, l.LoadOnModel_B, l.LoadMode.name) for l in loras], patterns
+
+
+def time_runs(node, runs) -> float:
+    start = time.perf_counter()
+    for template, options, seed in runs:
+        outcome(node.main, seed=seed, prompt=template, **options)
+    return time.perf_counter() - start
+
+
+@pytest.fixture(scope="session")
+def benchmark_dir(wildcard_dir, tmp_path_factory):
+    root = tmp_path_factory.mktemp("benchmark") / "wildcards"
+    shutil.copytree(wildcard_dir, root)
+    with open(root / "large.txt", "w", encoding="utf-8") as f:
+        for i in range(LARGE_FILE_LINES):
+            f.write(f"{WORDS[i % len(WORDS)]} {i}" + (", {a|b|c}" if i % 10 == 0 else "") + (" __colors__" if i % 50 == 0 else "") + "\n")
+    (root / "pool").mkdir()
+    with open(root / "poolconcatenated.txt", "w", encoding="utf-8") as concatenated:
+        for k in range(POOL_FILES):
+            with open(root / "pool" / f"part{k}.txt", "w", encoding="utf-8") as f:
+                for i in range(POOL_FILE_LINES):
+                    line = f"pool {k} {WORDS[i % len(WORDS)]} {i}" + (" {x|y}" if i % 7 == 0 else "") + "\n"
+                    f.write(line)
+                    concatenated.write(line)
+    return str(root)
+
+
+def read_speedup_baseline() -> dict:
+    try:
+        with open(SPEEDUP_BASELINE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_node_matches_reference(case, wildcard_dir):
+    rng = random.Random(f"silver-bdp-{case}")
+    generator = TemplateGenerator(rng, CASES[case])
+    reference_node = reference_nodes.SILVER_BasicDynamicPrompts()
+    node = nodes.SILVER_BasicDynamicPrompts()
+    
+    for _ in range(TEMPLATES_PER_CASE):
+        template = generator.template()
+        options = node_options(rng, wildcard_dir)
+        for _ in range(SEEDS_PER_TEMPLATE):
+            seed = rng.randint(0, 2**32)
+            expected = outcome(reference_node.main, seed=seed, prompt=template, **options)
+            assert outcome(node.main, seed=seed, prompt=template, **options) == expected, f"{case}: seed {seed}, options {options}, template {template!r}"
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_speedup_matches_baseline(case, benchmark_dir, monkeypatch, record_property):
+    monkeypatch.setattr(comfy_stubs, "LORA_FILES", comfy_stubs.LORA_FILES + BENCHMARK_LORA_FILES)
+    rng = random.Random(f"silver-bdp-benchmark-{case}")
+    generator = TemplateGenerator(rng, CASES[case], BENCHMARK_WILDCARDS, BENCHMARK_LORA_NAMES)
+    reference_node = reference_nodes.SILVER_BasicDynamicPrompts()
+    node = nodes.SILVER_BasicDynamicPrompts()
+    
+    runs, reference_runs = [], []
+    for _ in range(BENCHMARK_TEMPLATES):
+        template = generator.template()
+        options = node_options(rng, benchmark_dir)
+        for _ in range(BENCHMARK_SEEDS):
+            seed = rng.randint(0, 2**32)
+            runs.append((template, options, seed))
+            reference_runs.append((template.replace(REFERENCE_POOL, REFERENCE_POOL_FILE), options, seed))
+    
+    # Same outputs on the large setup (the template is also one of them), which also warms up both engines
+    for (template, options, seed), (reference_template, _, _) in zip(runs, reference_runs):
+        expected = outcome(reference_node.main, seed=seed, prompt=reference_template, **options)
+        result = outcome(node.main, seed=seed, prompt=template, **options)
+        if isinstance(result, tuple):
+            result = tuple(r.replace(REFERENCE_POOL, REFERENCE_POOL_FILE) if isinstance(r, str) else r for r in result)
+        assert result == expected, f"{case}: seed {seed}, options {options}, template {template!r}"
+    
+    # Best of TIMING_REPEATS - without the resolved prompt cache, every run of the current engine is a real resolution
+    monkeypatch.setattr(nodes, "RESOLVED_PROMPT_CACHE", nodes.ResolvedPromptCache(max_size=0))
+    rounds = max(1, math.ceil(MIN_TIMED_SECONDS / time_runs(reference_node, reference_runs)))
+    reference_time = current_time = float("inf")
+    for _ in range(TIMING_REPEATS):
+        current_time = min(current_time, time_runs(node, runs * rounds))
+        reference_time = min(reference_time, time_runs(reference_node, reference_runs * rounds))
+    
+    speedup = reference_time / current_time
+    record_property("speedup", round(speedup, 3))
+    print(f"{case}: reference {reference_time:.3f}s, current {current_time:.3f}s, speedup x{speedup:.2f}")
+    
+    baseline = read_speedup_baseline()
+    if RECORD_SPEEDUP:
+        baseline[case] = round(speedup, 2)
+        with open(SPEEDUP_BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(baseline.items())), f, indent=4)
+            f.write("\n")
+        return
+    assert case in baseline, f"{case}: no committed speedup baseline, run with SILVER_BDP_RECORD_SPEEDUP=1"
+    minimum = baseline[case] * SPEEDUP_TOLERANCE
+    assert speedup >= minimum, f"{case}: x{speedup:.2f} speedup over the reference engine (baseline x{baseline[case]}, min x{minimum:.2f})"
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_dynamic_prompts_matches_reference(case, wildcard_dir):
+    rng = random.Random(f"silver-bdp-dynamic-{case}")
+    generator = TemplateGenerator(rng, CASES[case])
+    for _ in range(TEMPLATES_PER_CASE):
+        template = generator.template()
+        options = node_options(rng, wildcard_dir)
+        kwargs = dict(line_suffix=options["line_suffix"], single_line_output=options["single_line_output"],
+                      remove_whitespaces=options["remove_whitespaces"], remove_empty_tags=options["remove_empty_tags"], wildcard_dir=wildcard_dir)
+        for _ in range(SEEDS_PER_TEMPLATE):
+            seed = rng.randint(0, 2**32)
+            expected = outcome(reference_nodes.dynamic_prompts, template, seed, **kwargs)
+            assert outcome(nodes.dynamic_prompts, template, seed, **kwargs) == expected, f"{case}: seed {seed}, template {template!r}"
+
+
+def test_parse_lora_patterns_matches_reference():
+    rng = random.Random("silver-bdp-loras")
+    generator = TemplateGenerator(rng, {"loras", "comments"})
+    for _ in range(TEMPLATES_PER_CASE * SEEDS_PER_TEMPLATE):
+        prompt = generator.template()
+        if rng.random() < 0.1:
+            prompt += "<lora:" + generator.lora_tag() # nested/unterminated tags
+        assert lora_summary(nodes.parse_lora_patterns(prompt)) == lora_summary(reference_nodes.parse_lora_patterns(prompt)), repr(prompt)
@@ -0,0 +1,111 @@
+"""
+Folder pools ('__folder/*__'): one uniform draw over the valid lines of every .txt file directly inside the folder - the same draw as a
+single file holding those files one after the other - kept up to date file by file.
+"""
+import os
+import random
+import time
+from collections import Counter
+
+import pytest
+
+import nodes
+import reference_nodes
+
+
+POOL_FILES = {
+    "pool/a.txt": "# animals\ncat\ndog # good\n\nbird\n",
+    "pool/B.TXT": "red\nblue\n",
+    "pool/empty.txt": "# nothing\n",
+    "pool/notes.md": "never picked\n",
+    "pool/sub/nested.txt": "never picked either\n",
+}
+CONCATENATED = "red\nblue\ncat\ndog\nbird\n" # 'B.TXT' sorts before 'a.txt'
+CHI_SQUARE_LIMIT = 18.47 # 4 degrees of freedom, p = 0.001
+LARGE_POOL_FILES, LARGE_POOL_LINES = 4, 50_000
+
+
+@pytest.fixture
+def pool_dir(tmp_path):
+    for relative, content in {**POOL_FILES, "concatenated.txt": CONCATENATED}.items():
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    return tmp_path
+
+
+def rewrite_file(path, content: str):
+    """
+    Edits a file in place (the folder mtime does not change) with an mtime one second later.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+def test_pool_matches_concatenated_file(pool_dir):
+    for seed in range(200):
+        expected = reference_nodes.dynamic_prompts("__concatenated__", seed, wildcard_dir=str(pool_dir))
+        assert nodes.dynamic_prompts("__POOL/*__", seed, wildcard_dir=str(pool_dir)) == expected
+
+
+def test_draws_are_uniform(pool_dir):
+    random.seed(0)
+    draws = Counter(nodes.WILDCARD_POOL_INDEX.pick(str(pool_dir / "pool")) for _ in range(5000))
+    
+    assert set(draws) == set(CONCATENATED.split())
+    expected = 5000 / len(draws)
+    assert sum((count - expected) ** 2 / expected for count in draws.values()) < CHI_SQUARE_LIMIT, draws
+
+
+def test_editing_one_file_rebuilds_only_that_file(pool_dir):
+    folder = str(pool_dir / "pool")
+    nodes.WILDCARD_POOL_INDEX.pick(folder)
+    builds = nodes.SHARED_INDEX.builds
+    
+    rewrite_file(pool_dir / "pool" / "a.txt", "fish\n")
+    random.seed(0)
+    draws = {nodes.WILDCARD_POOL_INDEX.pick(folder) for _ in range(200)}
+    
+    assert draws == {"red", "blue", "fish"}
+    assert nodes.SHARED_INDEX.builds - builds == 1
+
+
+def test_added_file_joins_the_pool(pool_dir, write_later):
+    folder = str(pool_dir / "pool")
+    nodes.WILDCARD_POOL_INDEX.pick(folder)
+    write_later(pool_dir / "pool" / "c.txt", "green\n")
+    
+    random.seed(0)
+    assert "green" in {nodes.WILDCARD_POOL_INDEX.pick(folder) for _ in range(200)}
+
+
+def test_editor_lists_pools_and_uppercase_extensions(pool_dir):
+    wildcard_files = nodes.scan_wildcard_files(str(pool_dir))
+    
+    assert {"pool/*", "pool/b", "pool/b.txt", "pool/a", "pool/sub/*"} <= set(wildcard_files)
+    assert "pool/notes" not in wildcard_files
+
+
+def test_large_pool_pick_is_cheap(tmp_path):
+    (tmp_path / "large").mkdir()
+    with open(tmp_path / "concatenated.txt", "w", encoding="utf-8") as concatenated:
+        for k in range(LARGE_POOL_FILES):
+            with open(tmp_path / "large" / f"part{k}.txt", "w", encoding="utf-8") as f:
+                for i in range(LARGE_POOL_LINES):
+                    line = f"part {k} line {i}" + (", {a|b}" if i % 2 else "") + "\n"
+                    f.write(line)
+                    concatenated.write(line)
+    
+    start = time.perf_counter()
+    expected = reference_nodes.dynamic_prompts("__concatenated__", 0, wildcard_dir=str(tmp_path))
+    reference_time = time.perf_counter() - start
+    assert nodes.dynamic_prompts("__large/*__", 0, wildcard_dir=str(tmp_path)) == expected
+    
+    runs = 20
+    start = time.perf_counter()
+    for seed in range(runs):
+        nodes.dynamic_prompts("__large/*__", seed, wildcard_dir=str(tmp_path))
+    current_time = (time.perf_counter() - start) / runs
+    
+    assert current_time < reference_time / 10, f"{current_time * 1000:.1f} ms per prompt vs {reference_time * 1000:.1f} ms for the reference"
@@ -0,0 +1,106 @@
+"""
+ResolvedPromptCache: repeated jobs are served from the cache, the LRU keeps it bounded, and an entry is dropped as soon as one of
+the wildcard files or folders it was resolved from changes.
+"""
+import os
+
+import pytest
+
+import comfy_stubs
+import nodes
+
+
+RESOLVE_OPTIONS = dict(line_suffix="", single_line_output=True, remove_whitespaces=True, remove_empty_tags=True, remove_loras_pattern=True)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = nodes.ResolvedPromptCache(max_size=2)
+    monkeypatch.setattr(nodes, "RESOLVED_PROMPT_CACHE", cache)
+    return cache
+
+
+@pytest.fixture
+def wildcards(tmp_path):
+    (tmp_path / "color.txt").write_text("red\n", encoding="utf-8")
+    (tmp_path / "pool").mkdir()
+    (tmp_path / "pool" / "a.txt").write_text("cat\n", encoding="utf-8")
+    return tmp_path
+
+
+def resolve(prompt: str, wildcard_dir, seed: int = 1, **options) -> str:
+    return nodes.resolve_prompt(prompt, seed, wildcard_dir=str(wildcard_dir), **{**RESOLVE_OPTIONS, **options})[0]
+
+
+def test_repeated_job_is_a_hit(cache, wildcards):
+    assert resolve("__color__ {a|b}", wildcards) == resolve("__color__ {a|b}", wildcards)
+    
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_least_recently_used_entry_is_evicted(cache, wildcards):
+    resolve("x", wildcards, seed=1)
+    resolve("x", wildcards, seed=2)
+    resolve("x", wildcards, seed=1) # hit: seed 2 is now the oldest entry
+    resolve("x", wildcards, seed=3)
+    resolve("x", wildcards, seed=1) # still cached
+    resolve("x", wildcards, seed=2) # evicted
+    
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 4, 2)
+    assert stats["hit_ratio"] == pytest.approx(2 / 6)
+
+
+def test_edited_wildcard_file_invalidates(cache, wildcards, write_later):
+    assert resolve("__color__", wildcards) == "red"
+    write_later(wildcards / "color.txt", "blue\n")
+    
+    assert resolve("__color__", wildcards) == "blue"
+    assert cache.stats()["hits"] == 0
+
+
+def test_created_wildcard_file_invalidates(cache, wildcards, write_later):
+    assert resolve("__shape__", wildcards) == "__shape__"
+    write_later(wildcards / "shape.txt", "round\n")
+    
+    assert resolve("__shape__", wildcards) == "round"
+
+
+def test_edited_pool_file_invalidates(cache, wildcards, write_later):
+    assert resolve("__pool/*__", wildcards) == "cat"
+    write_later(wildcards / "pool" / "a.txt", "dog\n")
+    
+    assert resolve("__pool/*__", wildcards) == "dog"
+
+
+def test_wildcard_in_line_suffix_invalidates(cache, wildcards, write_later):
+    # The suffix is only expanded by the second pass that follows the lora pattern removal
+    assert resolve("<lora:styleX> x", wildcards, line_suffix=" __color__") == "x red __color__"
+    write_later(wildcards / "color.txt", "blue\n")
+    
+    assert resolve("<lora:styleX> x", wildcards, line_suffix=" __color__") == "x blue __color__"
+
+
+def test_added_lora_file_invalidates_prompts_with_lora_tags(cache, wildcards, monkeypatch):
+    prompt = "x <lora:fresh:0.5>"
+    assert nodes.resolve_prompt(prompt, 1, wildcard_dir=str(wildcards), **RESOLVE_OPTIONS)[5] == ["fresh"] # not found
+    monkeypatch.setattr(comfy_stubs, "LORA_FILES", comfy_stubs.LORA_FILES + ["fresh.safetensors"])
+    
+    loras = nodes.resolve_prompt(prompt, 1, wildcard_dir=str(wildcards), **RESOLVE_OPTIONS)[1]
+    assert [lora.Name for lora in loras] == ["fresh"]
+    assert cache.stats()["hits"] == 0
+
+
+def test_hit_without_wildcards_or_loras_does_no_lookup(cache, wildcards, monkeypatch):
+    prompt = "lora_a red_hair, {a|b}_{c|d}"
+    expected = resolve(prompt, wildcards)
+    
+    calls = []
+    real_stat = os.stat
+    monkeypatch.setattr(os, "stat", lambda *args, **kwargs: calls.append(args) or real_stat(*args, **kwargs))
+    monkeypatch.setattr(comfy_stubs, "LORA_FILES", None) # any LoRA list lookup would fail
+    assert resolve(prompt, wildcards) == expected
+    assert calls == []
+    assert cache.stats()["hits"] == 1
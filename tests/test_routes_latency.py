@@ -0,0 +1,95 @@
+"""
+The editor routes must never block ComfyUI's event loop: their folder scans and launchers run on the default executor.
+The blocking helpers are replaced by slow stand-ins and the loop lag is measured while many route calls are in flight.
+"""
+import asyncio
+import time
+from typing import Tuple
+
+import pytest
+
+import nodes
+
+
+BLOCKING_DELAY = 0.3  # seconds each stubbed helper blocks its thread
+PROBE_INTERVAL = 0.01
+MAX_LOOP_LAG = 0.1    # far below BLOCKING_DELAY: any helper running on the loop itself shows up
+
+
+class FakeRequest:
+    def __init__(self, data: dict):
+        self._data = data
+    
+    async def json(self):
+        return self._data
+
+
+def slow(result):
+    def helper(*args):
+        time.sleep(BLOCKING_DELAY)
+        return result
+    return helper
+
+
+@pytest.fixture
+def slow_helpers(monkeypatch, tmp_path):
+    existing_file = tmp_path / "colors.txt"
+    existing_file.write_text("red\n", encoding="utf-8")
+    monkeypatch.setattr(nodes, "scan_wildcard_files", slow(["colors"]))
+    monkeypatch.setattr(nodes, "get_available_loras_stem", slow(["styleX"]))
+    monkeypatch.setattr(nodes, "find_lora_location", slow(str(existing_file)))
+    monkeypatch.setattr(nodes, "open_with_default_app", slow(None))
+    monkeypatch.setattr(nodes, "reveal_in_file_manager", slow(None))
+    sync = nodes.EditorDataSync()
+    monkeypatch.setattr(sync, "_ensure_started", lambda: None) # no polling thread in tests
+    monkeypatch.setattr(nodes, "EDITOR_DATA_SYNC", sync)
+    return str(existing_file)
+
+
+async def max_loop_lag(work) -> Tuple:
+    """
+    Runs 'work' while a probe sleeps PROBE_INTERVAL in a loop. Returns (largest extra delay seen by the probe, result of 'work').
+    """
+    lags = []
+    done = asyncio.Event()
+    
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+    
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0) # let the probe start
+    try:
+        result = await work
+    finally:
+        done.set()
+        await probe_task
+    return max(lags, default=0.0), result
+
+
+def test_probe_detects_blocking_calls():
+    async def blocking():
+        time.sleep(BLOCKING_DELAY)
+    
+    lag, _ = asyncio.run(max_loop_lag(blocking()))
+    assert lag >= BLOCKING_DELAY * 0.8
+
+
+def test_routes_do_not_block_the_event_loop(slow_helpers, tmp_path):
+    async def call_routes():
+        calls = []
+        for _ in range(4):
+            calls += [
+                nodes.bootstrap_editor_data(FakeRequest({"wildcard_dirs": [str(tmp_path)]})),
+                nodes.get_available_loras(FakeRequest({})),
+                nodes.get_wildcard_files(FakeRequest({"current_wildcard_dir": str(tmp_path)})),
+                nodes.quick_open_wildcard(FakeRequest({"file_path": slow_helpers})),
+                nodes.quick_open_lora_location(FakeRequest({"lora_name": "styleX"})),
+            ]
+        return await asyncio.gather(*calls)
+    
+    lag, responses = asyncio.run(max_loop_lag(call_routes()))
+    assert all(response.status == 200 for response in responses)
+    assert lag < MAX_LOOP_LAG, f"event loop blocked for {lag:.3f}s while the routes were running"
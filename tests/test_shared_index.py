@@ -0,0 +1,87 @@
+"""
+SharedIndexStore across processes: concurrent ComfyUI processes of the same user build a bundle once and attach to it,
+and a damaged bundle file is rebuilt instead of being trusted.
+"""
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import comfy_stubs # noqa: F401 - spawned workers do not load the conftest
+import nodes
+
+
+WORKERS = 4
+TABLES = [["alpha", "beta", "gamma"], ["x" * 100]]
+
+
+def build_slowly():
+    time.sleep(0.2) # long enough for every worker to miss the published file
+    return TABLES
+
+
+def build_or_attach(directory, barrier, results):
+    store = nodes.SharedIndexStore(directory)
+    barrier.wait()
+    tables = store.get("test", "key", 1, build_slowly)
+    results.put((store.builds, store.attaches, [list(table) for table in tables]))
+
+
+def run_workers(directory: str, count: int) -> list:
+    context = multiprocessing.get_context("spawn")
+    barrier, results = context.Barrier(count), context.Queue()
+    workers = [context.Process(target=build_or_attach, args=(directory, barrier, results)) for _ in range(count)]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get(timeout=120) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+    return outcomes
+
+
+def bundle_path(directory: str) -> str:
+    (filename,) = [f for f in os.listdir(directory) if f.endswith(".idx")]
+    return os.path.join(directory, filename)
+
+
+def test_concurrent_processes_build_once(tmp_path):
+    outcomes = run_workers(str(tmp_path), WORKERS)
+    
+    assert sum(builds for builds, _, _ in outcomes) == 1
+    assert sum(attaches for _, attaches, _ in outcomes) == WORKERS - 1
+    assert all(tables == TABLES for _, _, tables in outcomes)
+    assert not [f for f in os.listdir(tmp_path) if not f.endswith(".idx")] # no build marker or temporary file left
+
+
+@pytest.mark.parametrize("damage", ["truncated", "corrupted"])
+def test_damaged_bundle_is_rebuilt(tmp_path, damage):
+    nodes.SharedIndexStore(str(tmp_path)).get("test", "key", 1, lambda: TABLES)
+    path = bundle_path(str(tmp_path))
+    with open(path, "r+b") as f:
+        if damage == "truncated":
+            f.truncate(os.path.getsize(path) // 2)
+        else:
+            f.seek(16)
+            f.write(b"\xff" * 8) # first table offset now points outside of the file
+    
+    store = nodes.SharedIndexStore(str(tmp_path))
+    assert [list(table) for table in store.get("test", "key", 1, lambda: TABLES)] == TABLES
+    assert (store.builds, store.attaches) == (1, 0)
+    
+    store = nodes.SharedIndexStore(str(tmp_path))
+    assert [list(table) for table in store.get("test", "key", 1, lambda: TABLES)] == TABLES
+    assert (store.builds, store.attaches) == (0, 1)
+
+
+def test_stale_build_marker_is_ignored(tmp_path):
+    store = nodes.SharedIndexStore(str(tmp_path))
+    store.BUILD_WAIT = 0.5
+    path = os.path.join(str(tmp_path), f"test-{store._digest('key')}-{store._digest(1)}.idx")
+    open(path + ".lock", "w").close()
+    os.utime(path + ".lock", (time.time() - 10, time.time() - 10)) # left behind by a process that died while building
+    
+    assert [list(table) for table in store.get("test", "key", 1, lambda: TABLES)] == TABLES
+    assert store.builds == 1
+    assert not os.path.exists(path + ".lock")
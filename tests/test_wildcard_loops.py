@@ -0,0 +1,93 @@
+"""
+Wildcard loop check: required wildcards that can never be fully expanded are rejected with the looping file chain, every other
+kind of recursion expands exactly like the reference engine, and the check stays cheap on large wildcard files.
+"""
+import os
+import re
+import time
+
+import pytest
+
+import nodes
+import reference_nodes
+
+
+LOOP_FILES = {
+    "a.txt": "start __b__\n",
+    "b.txt": "# __a__ is required below\nmiddle __a__\n",
+    "optional.txt": "{x|__optional__ again}\n",
+    "commented.txt": "y # __commented__\n",
+    "way_out.txt": "plain\n__way_out__ more\n",
+    "Loop/first.txt": "__Loop/second__\n",
+    "Loop/second.txt": "__LOOP/FIRST.txt__ {a|b}\n",
+}
+LARGE_FILE_LINES = 200_000
+
+
+@pytest.fixture(scope="module")
+def loop_dir(tmp_path_factory):
+    root = tmp_path_factory.mktemp("loops")
+    for relative, content in LOOP_FILES.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    return root
+
+
+@pytest.mark.parametrize("prompt, chain", [
+    ("__a__", "a.txt -> b.txt -> a.txt"),
+    ("x, {y|z} __b__", "b.txt -> a.txt -> b.txt"),
+    ("__loop/first__", "Loop/first.txt -> Loop/second.txt -> Loop/first.txt"),
+])
+def test_endless_loop_reports_the_chain(loop_dir, prompt, chain):
+    with pytest.raises(ValueError, match=re.escape("Wildcard loop detected: " + chain.replace("/", os.sep))):
+        nodes.dynamic_prompts(prompt, 0, wildcard_dir=str(loop_dir))
+
+
+@pytest.mark.parametrize("prompt", [
+    "__optional__",
+    "{x|__optional__}",
+    "__commented__",
+    "ok # __a__",
+    "{__a__|fine}",
+    "__way_out__",
+    "__way_out__, {__optional__|__commented__}",
+])
+def test_recursion_that_can_end_matches_reference(loop_dir, prompt):
+    for seed in range(50):
+        assert nodes.dynamic_prompts(prompt, seed, wildcard_dir=str(loop_dir)) == reference_nodes.dynamic_prompts(prompt, seed, wildcard_dir=str(loop_dir))
+
+
+def test_edit_that_breaks_the_loop_is_picked_up(tmp_path, write_later):
+    (tmp_path / "a.txt").write_text("__b__\n", encoding="utf-8")
+    (tmp_path / "b.txt").write_text("__a__\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        nodes.dynamic_prompts("__a__", 0, wildcard_dir=str(tmp_path))
+    
+    write_later(tmp_path / "b.txt", "__a__\nend\n")
+    assert nodes.dynamic_prompts("__a__", 0, wildcard_dir=str(tmp_path)) == reference_nodes.dynamic_prompts("__a__", 0, wildcard_dir=str(tmp_path))
+    
+    write_later(tmp_path / "b.txt", "__a__\n")
+    with pytest.raises(ValueError):
+        nodes.dynamic_prompts("__a__", 0, wildcard_dir=str(tmp_path))
+
+
+def test_large_file_is_parsed_once(tmp_path):
+    with open(tmp_path / "large.txt", "w", encoding="utf-8") as f:
+        for i in range(LARGE_FILE_LINES):
+            f.write(f"plain {i}\n" if i % 3 else f"word {i}, {{a|b}} # note __large__\n")
+    
+    builds = nodes.SHARED_INDEX.builds
+    start = time.perf_counter()
+    expected = reference_nodes.dynamic_prompts("__large__", 0, wildcard_dir=str(tmp_path))
+    reference_time = time.perf_counter() - start
+    assert nodes.dynamic_prompts("__large__", 0, wildcard_dir=str(tmp_path)) == expected
+    
+    runs = 20
+    start = time.perf_counter()
+    for seed in range(runs):
+        nodes.dynamic_prompts("__large__", seed, wildcard_dir=str(tmp_path))
+    current_time = (time.perf_counter() - start) / runs
+    
+    assert nodes.SHARED_INDEX.builds - builds == 2 # the file table, the folder listing
+    assert current_time < reference_time / 10, f"{current_time * 1000:.1f} ms per prompt vs {reference_time * 1000:.1f} ms for the reference"
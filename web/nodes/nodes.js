@@ -1,5 +1,6 @@
 import { app } from "../../../scripts/app.js";
-import { PreviewTooltip } from "../widgets/loras_widget_components.js";
+import { api } from "../../../scripts/api.js";
+import { PreviewTooltip, previewCache } from "../widgets/loras_widget_components.js";
 
 
 // Note: trying to block/bypass ComfyUI's native node CTRL+UP/DOWN/LEFT/RIGHT shortcuts does not work from within editor. Doing a global window listener and blocking it this way works
@@ -18,19 +19,143 @@ if (!window.comfy_silver_weight_listener_added) {
 }
 
 
+// Shared LoRA/wildcard data for every editor instance.
+// Filled once through the 'bootstrap' route, then kept in sync by the add/remove deltas the server pushes over the websocket.
+// A delta whose version does not directly follow the local one (missed message, reconnect) triggers a new bootstrap.
+if (!window.comfy_silver_editor_data) {
+	const store = {
+		loras: [],
+		lorasLowercase: new Set(),
+		lorasVersion: -1,
+		wildcards: new Map(), // wildcard_dir -> { version, files: Set }
+		listeners: new Map(), // listener -> getter of the wildcard directory its editor currently uses
+		pending: null,
+		pendingDirs: new Set(),
+		pendingStarted: false,
+		
+		subscribe(fn, wildcardDir = () => "") {
+			this.listeners.set(fn, wildcardDir);
+			return () => this.listeners.delete(fn);
+		},
+		notify() {
+			for (const fn of this.listeners.keys()) {
+				try { fn(); } catch (e) { console.error("[SILVER_BasicDynamicPrompts] listener error:", e); }
+			}
+		},
+		
+		setLoras(items, version) {
+			this.loras = items;
+			this.lorasLowercase = new Set(items.map(stem => stem.toLowerCase()));
+			this.lorasVersion = version;
+		},
+		findLora(name) {
+			const lower = name.toLowerCase();
+			if (!this.lorasLowercase.has(lower)) return undefined;
+			return this.loras.find(stem => stem.toLowerCase() === lower);
+		},
+		wildcardFiles(dir) {
+			return this.wildcards.get(dir)?.files;
+		},
+		isWildcardDirInUse(dir) {
+			for (const wildcardDir of this.listeners.values()) {
+				if (wildcardDir() === dir) return true;
+			}
+			return false;
+		},
+		
+		async bootstrap(wildcard_dirs = []) {
+			const resp = await fetch("/silver_basicdynamicprompts/bootstrap", {
+				method: "POST",
+				headers: { "Content-Type": "application/json" },
+				body: JSON.stringify({ wildcard_dirs })
+			});
+			if (!resp.ok) return;
+			const data = await resp.json();
+			if (data.loras) this.setLoras(data.loras.items || [], data.loras.version);
+			for (const [dir, entry] of Object.entries(data.wildcards || {})) {
+				this.wildcards.set(dir, { version: entry.version, files: new Set(entry.items || []) });
+			}
+			this.notify();
+		},
+		// Many nodes ask at once when a workflow loads: merge those into a single request
+		ensure(wildcard_dir = "") {
+			const needLoras = this.lorasVersion < 0;
+			const needDir = wildcard_dir && !this.wildcards.has(wildcard_dir);
+			if (!needLoras && !needDir) return Promise.resolve();
+			if (!this.pending || this.pendingStarted) {
+				const dirs = new Set();
+				const batch = new Promise(resolve => setTimeout(resolve, 0))
+					.then(() => {
+						if (this.pending === batch) this.pendingStarted = true;
+						return this.bootstrap([...dirs]);
+					})
+					.catch(e => console.error("[SILVER_BasicDynamicPrompts] bootstrap failed:", e))
+					.finally(() => { if (this.pending === batch) this.pending = null; });
+				this.pending = batch;
+				this.pendingDirs = dirs;
+				this.pendingStarted = false;
+			}
+			if (needDir) this.pendingDirs.add(wildcard_dir);
+			return this.pending;
+		},
+		
+		applyLorasDelta(delta) {
+			if (this.lorasVersion < 0) return;
+			if (delta.version !== this.lorasVersion + 1) {
+				this.lorasVersion = -1;
+				this.ensure();
+				return;
+			}
+			const removed = new Set(delta.removed || []);
+			this.setLoras(this.loras.filter(stem => !removed.has(stem)).concat(delta.added || []), delta.version);
+			this.notify();
+		},
+		applyWildcardsDelta(delta) {
+			const entry = this.wildcards.get(delta.wildcard_dir);
+			if (!entry) return;
+			if (delta.dropped) {
+				// The server stopped watching this directory (not requested for a while): only ask again if an open editor still uses it
+				this.wildcards.delete(delta.wildcard_dir);
+				if (this.isWildcardDirInUse(delta.wildcard_dir)) this.ensure(delta.wildcard_dir);
+				return;
+			}
+			if (delta.version !== entry.version + 1) {
+				this.wildcards.delete(delta.wildcard_dir);
+				this.ensure(delta.wildcard_dir);
+				return;
+			}
+			for (const f of delta.removed || []) entry.files.delete(f);
+			for (const f of delta.added || []) entry.files.add(f);
+			entry.version = delta.version;
+			this.notify();
+		},
+		resync() {
+			const dirs = [...this.wildcards.keys()];
+			this.lorasVersion = -1;
+			this.wildcards.clear();
+			return this.bootstrap(dirs).catch(e => console.error("[SILVER_BasicDynamicPrompts] bootstrap failed:", e));
+		},
+	};
+	
+	api.addEventListener("silver_basicdynamicprompts.loras_delta", (e) => store.applyLorasDelta(e.detail));
+	api.addEventListener("silver_basicdynamicprompts.wildcards_delta", (e) => store.applyWildcardsDelta(e.detail));
+	api.addEventListener("reconnected", () => store.resync());
+	window.comfy_silver_editor_data = store;
+}
+const editorData = window.comfy_silver_editor_data;
+
+
 app.registerExtension({
     name: "Comfy.SILVER_BasicDynamicPrompts",
     async beforeRegisterNodeDef(nodeType, nodeData, app) {
         if (nodeData.name !== "SILVER_BasicDynamicPrompts") return;
 		
-		let availableLoras = [];
-		let availableLorasLowercase = [];
-		
 		let current_wildcard_directory = "";
 		let stored_wildcard_directory = "";
 		let hovered_wildcard_content = "";
 		let hovered_lora_content = "";
-		let wildcard_files = [];
+		
+		const isWildcardFile = (name) => editorData.wildcardFiles(current_wildcard_directory)?.has(name) ?? false;
 		
         // Advanced syntax highlighting with fixed comment typing behavior
 		const highlight = (text) => {			
@@ -81,7 +206,7 @@ app.registerExtension({
 			// Wildcards
 			work = work.replace(/__.*?__/g, (match) => {
 				const content = match.slice(2, -2);
-				const color = wildcard_files.includes(content.replace(/[\\/]+/g, "\\").toLowerCase()) ? "#FFD700" : "#FF4444";
+				const color = isWildcardFile(content.replace(/[\\/]+/g, "\\").toLowerCase()) ? "#FFD700" : "#FF4444";
 				const safe = escapeHTML(match);
 				return protect(`<span style="color:${color}; font-weight:bold;">${safe}</span>`);
 			});
@@ -93,7 +218,7 @@ app.registerExtension({
 				else if (prefix.toLowerCase().endsWith("_b") || prefix.toLowerCase().indexOf("_b_") !== -1) baseColor = "#7FFFD4";
 				else baseColor = "#F4A460";
 		
-				const tagColor = availableLorasLowercase.includes(name.trim().toLowerCase()) ? baseColor : "#FF4444";
+				const tagColor = editorData.lorasLowercase.has(name.trim().toLowerCase()) ? baseColor : "#FF4444";
 				const tagStyle = `color:${tagColor}; font-weight:bold;`;
 		
 				let innerRaw = match.slice(1, -1);
@@ -274,24 +399,7 @@ app.registerExtension({
 		
 		
 		async function get_wildcard_files() {
-			const resp = await fetch("/silver_basicdynamicprompts/get_wildcard_files", {
-				method: "POST",
-				headers: { "Content-Type": "application/json" },
-				body: JSON.stringify({current_wildcard_dir: current_wildcard_directory})
-			});
-			const data = await resp.json();
-			wildcard_files = data.wildcard_files || [];
-		};
-		
-		async function get_available_loras() {
-			const resp = await fetch("/silver_basicdynamicprompts/get_available_loras", {
-				method: "POST",
-				headers: { "Content-Type": "application/json" },
-				body: JSON.stringify({})
-			});
-			const data = await resp.json();
-			availableLoras = data.available_loras || [];
-			availableLorasLowercase = availableLoras.map(stem => stem.toLowerCase());
+			await editorData.ensure(current_wildcard_directory);
 		};
 		// --- [End of helper functions] ---
 		
@@ -320,11 +428,12 @@ app.registerExtension({
 			
             let hoverTimeout = null;
             const HOVER_DELAY = 1000; // 1 second delay before showing tooltip
+            const HOVER_DELAY_CACHED = 250; // shorter delay when the preview is already loaded
             let currentHoverElement = null;
             // ---------------------------
 			
-			// --- 1. GET AVAILABLE LORAS ---
-			get_available_loras();
+			// --- 1. GET AVAILABLE LORAS (shared store, fetched once for all nodes) ---
+			editorData.ensure();
 			
 			// --- 2. SETUP PROMPT WIDGET AND CUSTOM EDITOR ---
             const prompt_widget = this.widgets?.find(w => w.name === "prompt");
@@ -356,10 +465,22 @@ app.registerExtension({
 			editor.style.fontSize = `${editorFontSize}px`;
 			
 			
+            // Warm the shared preview cache (in idle time) for every existing lora used in the text
+            const prefetchLoraPreviews = (text) => {
+                if (!tooltip || !previewCache) return;
+                const names = new Set();
+                for (const m of text.matchAll(/<(lora|lora_a|lora_b|lora_visual|lora_a_visual|lora_b_visual|lora_audio|lora_a_audio|lora_b_audio):([^:\n\r>]+)(?::[^\n\r>]*)?>/gi)) {
+                    const loraName = editorData.findLora(m[2].trim());
+                    if (loraName) names.add(loraName);
+                }
+                if (names.size > 0) previewCache.prefetch(names);
+            };
+            
             // Function to synchronize the custom editor from the ComfyUI widget value
             const updateEditorContent = () => {
                 const text = prompt_widget.value || "";
                 editor.innerHTML = highlight(text);
+                prefetchLoraPreviews(text);
                 this.setDirtyCanvas(true, true); // Ensure the canvas updates its size if content changes on load
             };
             
@@ -489,7 +610,9 @@ app.registerExtension({
 						e.preventDefault();
 						e.stopPropagation();
 						
-						const wildcard_file_path = current_wildcard_directory + "\\" + (hovered_wildcard_content.toLowerCase().endsWith(".txt") ? hovered_wildcard_content : hovered_wildcard_content + ".txt");
+						const wildcard_file_path = hovered_wildcard_content.endsWith("*")
+							? current_wildcard_directory + "\\" + hovered_wildcard_content.slice(0, -1) // folder pool -> open the folder
+							: current_wildcard_directory + "\\" + (hovered_wildcard_content.toLowerCase().endsWith(".txt") ? hovered_wildcard_content : hovered_wildcard_content + ".txt");
 						fetch("/silver_basicdynamicprompts/quick_open_wildcard", {
 							method: "POST",
 							headers: {
@@ -651,7 +774,7 @@ app.registerExtension({
 					const end = start + wm[0].length;
 					if (caretIndex >= start && caretIndex <= end) {
 						const content = wm[0].slice(2, -2).replace(/[\\/]+/g, "\\");
-						if (content && wildcard_files.includes(content.toLowerCase())) {
+						if (content && isWildcardFile(content.toLowerCase())) {
 							hovered_wildcard_content = content;
 							return;
 						}
@@ -681,9 +804,7 @@ app.registerExtension({
 					const loraName = foundLora.name ? foundLora.name.trim() : null;
 					if (loraName) {
 						
-						const originalCasedMatch = availableLoras.find(availableName =>
-							availableName.toLowerCase() === loraName.toLowerCase()
-						);
+						const originalCasedMatch = editorData.findLora(loraName);
 						let finalLoraName = loraName; // Use loraName as default
 						if (originalCasedMatch) {
 							finalLoraName = originalCasedMatch;
@@ -697,7 +818,7 @@ app.registerExtension({
 							hoverTimeout = setTimeout(async () => {
 								hoverTimeout = null;
 								await tooltip.show(finalLoraName, x, y);
-							}, HOVER_DELAY);
+							}, previewCache?.isReady(finalLoraName) ? HOVER_DELAY_CACHED : HOVER_DELAY);
 						}
 			
 						// Update tooltip position if already visible
@@ -826,10 +947,16 @@ app.registerExtension({
 			
             this.setDirtyCanvas(true, true);
 			
+			// Re-highlight when the shared LoRA/wildcard data changes (not while typing - the next edit re-highlights anyway)
+			const unsubscribeEditorData = editorData.subscribe(() => {
+				if (document.activeElement !== editor) updateEditorContent();
+			}, () => wildcard_directory_widget?.value || "");
+			
             // cleanup
 			const origOnRemoved = this.onRemoved;
             this.onRemoved = function() {
 				origOnRemoved?.apply(this, arguments);
+				unsubscribeEditorData();
                 editor.remove();
 				if (tooltip) {
                     tooltip.cleanup();
@@ -1,5 +1,165 @@
 import { api } from "/scripts/api.js";
 
+// Shared (all nodes, all tooltips) LRU of lora preview URLs and of their already loaded media elements.
+// Missing previews are cached too (for NEGATIVE_TTL) so hovering a lora without preview does not refetch every time.
+// The cached media element is never displayed: each tooltip shows its own clone of it (see 'createView'), and entries that a
+// tooltip is currently showing are not evicted.
+class PreviewCache {
+  constructor(maxEntries = 64) {
+    this.maxEntries = maxEntries;
+    this.entries = new Map(); // loraName -> { url, media, promise, expires, pending, shown }
+    this.prefetchQueue = [];
+    this.prefetchScheduled = false;
+  }
+
+  static NEGATIVE_TTL = 5 * 60 * 1000;
+  static MEDIA_TIMEOUT = 1000;
+  static NETWORK_ERROR_TTL = 10 * 1000;
+
+  touch(loraName, entry) {
+    this.entries.delete(loraName);
+    this.entries.set(loraName, entry);
+    // Oldest first, skipping the entries currently shown by a tooltip
+    for (const [name, candidate] of this.entries) {
+      if (this.entries.size <= this.maxEntries) break;
+      if (candidate.shown > 0 || candidate === entry) continue;
+      this.entries.delete(name);
+      this.release(candidate);
+    }
+  }
+
+  release(entry) {
+    PreviewCache.stopVideo(entry.media);
+    entry.media = null;
+  }
+
+  static stopVideo(media) {
+    if (media && media.tagName === 'VIDEO') {
+      media.pause();
+      media.removeAttribute('src');
+      media.load();
+    }
+  }
+
+  // A media element for one tooltip: a DOM node only has one parent, so the cached element itself would be moved out of
+  // any other tooltip showing it. The clone reuses the data the browser already loaded for the cached one.
+  // Every view must be given back with 'releaseView' once it is not displayed anymore.
+  createView(entry) {
+    const view = entry.media.cloneNode(true);
+    if (view.tagName === 'VIDEO') {
+      view.muted = true; // a property only, not copied by cloneNode
+    }
+    entry.shown++;
+    return view;
+  }
+
+  releaseView(entry, view) {
+    entry.shown--;
+    PreviewCache.stopVideo(view);
+  }
+
+  // Resolves to the entry ({ url, media }) with a loaded media element, or { url: null } when there is no preview
+  load(loraName) {
+    const cached = this.entries.get(loraName);
+    if (cached && (cached.pending || cached.url !== null || cached.expires > Date.now())) {
+      this.touch(loraName, cached);
+      return cached.promise;
+    }
+
+    const entry = { url: null, media: null, promise: null, expires: 0, pending: true, shown: 0 };
+    entry.promise = this.fetchEntry(loraName, entry).finally(() => { entry.pending = false; });
+    this.touch(loraName, entry);
+    return entry.promise;
+  }
+
+  async fetchEntry(loraName, entry) {
+    try {
+      const response = await api.fetchApi(`/lm/loras/preview-url?name=${encodeURIComponent(loraName)}`, {
+        method: 'GET'
+      });
+      const data = response.ok ? await response.json() : null;
+      if (!data || !data.success || !data.preview_url) {
+        entry.expires = Date.now() + PreviewCache.NEGATIVE_TTL;
+        return entry;
+      }
+      entry.url = data.preview_url;
+      entry.media = await this.createMedia(entry.url);
+    } catch (error) {
+      // Network errors are not cached for long - the preview server may just be restarting
+      entry.expires = Date.now() + PreviewCache.NETWORK_ERROR_TTL;
+    }
+    return entry;
+  }
+
+  createMedia(url) {
+    const isVideo = url.endsWith('.mp4');
+    const mediaElement = isVideo ? document.createElement('video') : document.createElement('img');
+
+    Object.assign(mediaElement.style, {
+      maxWidth: '300px',
+      maxHeight: '300px',
+      objectFit: 'contain',
+      display: 'block',
+    });
+
+    if (isVideo) {
+      mediaElement.autoplay = true;
+      mediaElement.loop = true;
+      mediaElement.muted = true;
+      mediaElement.controls = false;
+      mediaElement.preload = 'auto';
+    }
+
+    // Wait for media to load (or fail / time out) so showing it later is instant
+    return new Promise((resolve) => {
+      const done = () => resolve(mediaElement);
+      if (isVideo) {
+        mediaElement.addEventListener('loadeddata', done, { once: true });
+        mediaElement.addEventListener('error', done, { once: true });
+      } else {
+        mediaElement.addEventListener('load', () => {
+          (mediaElement.decode ? mediaElement.decode() : Promise.resolve()).catch(() => {}).then(done);
+        }, { once: true });
+        mediaElement.addEventListener('error', done, { once: true });
+      }
+      setTimeout(done, PreviewCache.MEDIA_TIMEOUT);
+      mediaElement.src = url;
+    });
+  }
+
+  // True when showing this lora's preview (or its absence) needs no network/decoding work
+  isReady(loraName) {
+    const cached = this.entries.get(loraName);
+    return !!cached && !cached.pending && (cached.url !== null || cached.expires > Date.now());
+  }
+
+  // Loads previews of the given loras one at a time while the browser is idle
+  prefetch(loraNames) {
+    for (const loraName of loraNames) {
+      if (!this.entries.has(loraName) && !this.prefetchQueue.includes(loraName)) {
+        this.prefetchQueue.push(loraName);
+      }
+    }
+    this.schedulePrefetch();
+  }
+
+  schedulePrefetch() {
+    if (this.prefetchScheduled || this.prefetchQueue.length === 0) return;
+    this.prefetchScheduled = true;
+    const idle = window.requestIdleCallback || ((cb) => setTimeout(cb, 200));
+    idle(async () => {
+      const loraName = this.prefetchQueue.shift();
+      if (loraName !== undefined && !this.entries.has(loraName)) {
+        await this.load(loraName);
+      }
+      this.prefetchScheduled = false;
+      this.schedulePrefetch();
+    });
+  }
+}
+
+export const previewCache = new PreviewCache();
+
 // Preview tooltip class
 export class PreviewTooltip {
   constructor() {
@@ -18,6 +178,9 @@ export class PreviewTooltip {
     document.body.appendChild(this.element);
     this.hideTimeout = null;
     this.isFromAutocomplete = false;
+    this.requestId = 0; // bumped by every show/hide - a preview finishing to load for an older request is dropped
+    this.shownEntry = null; // cache entry and media view currently displayed (see 'PreviewCache.createView')
+    this.shownMedia = null;
     
     // Modified event listeners for autocomplete compatibility
     this.globalClickHandler = (e) => {
@@ -50,25 +213,19 @@ export class PreviewTooltip {
       }
 
       this.currentLora = loraName;
+      const requestId = ++this.requestId;
       
-      // Get preview URL
-      const response = await api.fetchApi(`/lm/loras/preview-url?name=${encodeURIComponent(loraName)}`, {
-        method: 'GET'
-      });
-
-      if (!response.ok) {
-        throw new Error('Failed to fetch preview URL');
-      }
-
-      const data = await response.json();
-      if (!data.success || !data.preview_url) {
+      // Get preview URL and media (cached)
+      const entry = await previewCache.load(loraName);
+      if (!entry.url || !entry.media) {
         throw new Error('No preview available');
       }
 
+      // The mouse already moved to another lora (or away) while loading
+      if (requestId !== this.requestId) return;
+
       // Clear existing content
-      while (this.element.firstChild) {
-        this.element.removeChild(this.element.firstChild);
-      }
+      this.clearContent();
 
       // Create media container with relative positioning
       const mediaContainer = document.createElement('div');
@@ -78,22 +235,10 @@ export class PreviewTooltip {
         maxHeight: '300px',
       });
 
-      const isVideo = data.preview_url.endsWith('.mp4');
-      const mediaElement = isVideo ? document.createElement('video') : document.createElement('img');
-
-      Object.assign(mediaElement.style, {
-        maxWidth: '300px',
-        maxHeight: '300px',
-        objectFit: 'contain',
-        display: 'block',
-      });
-
-      if (isVideo) {
-        mediaElement.autoplay = true;
-        mediaElement.loop = true;
-        mediaElement.muted = true;
-        mediaElement.controls = false;
-      }
+      const mediaElement = previewCache.createView(entry);
+      const isVideo = mediaElement.tagName === 'VIDEO';
+      this.shownEntry = entry;
+      this.shownMedia = mediaElement;
 
       // Create name label with absolute positioning
       const nameLabel = document.createElement('div');
@@ -124,35 +269,10 @@ export class PreviewTooltip {
       this.element.style.opacity = '0';
       this.element.style.display = 'block';
       
-      // Wait for media to load before positioning
-      const waitForLoad = () => {
-        return new Promise((resolve) => {
-          if (isVideo) {
-            if (mediaElement.readyState >= 2) { // HAVE_CURRENT_DATA
-              resolve();
-            } else {
-              mediaElement.addEventListener('loadeddata', resolve, { once: true });
-              mediaElement.addEventListener('error', resolve, { once: true });
-            }
-          } else {
-            if (mediaElement.complete) {
-              resolve();
-            } else {
-              mediaElement.addEventListener('load', resolve, { once: true });
-              mediaElement.addEventListener('error', resolve, { once: true });
-            }
-          }
-          
-          // Set a timeout to prevent hanging
-          setTimeout(resolve, 1000);
-        });
-      };
-
-      // Set source after setting up load listeners
-      mediaElement.src = data.preview_url;
-      
-      // Wait for content to load, then position and show
-      await waitForLoad();
+      // Media was loaded by the cache - only start video playback
+      if (isVideo) {
+        mediaElement.play().catch(() => {});
+      }
       
       // Small delay to ensure layout is complete
       requestAnimationFrame(() => {
@@ -195,6 +315,8 @@ export class PreviewTooltip {
   }
 
   hide() {
+    // Also cancels a preview that is still loading, so it never pops up once the mouse is gone
+    this.requestId++;
     // Use fade-out effect
     if (this.element.style.display === 'block') {
       this.element.style.opacity = '0';
@@ -202,13 +324,24 @@ export class PreviewTooltip {
         this.element.style.display = 'none';
         this.currentLora = null;
         this.isFromAutocomplete = false;
-        // Stop video playback
-        const video = this.element.querySelector('video');
-        if (video) {
-          video.pause();
-        }
+        // Stop video playback and give the preview back to the cache
+        this.clearContent();
         this.hideTimeout = null;
       }, 150);
+    } else {
+      this.currentLora = null;
+      this.isFromAutocomplete = false;
+    }
+  }
+
+  clearContent() {
+    if (this.shownEntry) {
+      previewCache.releaseView(this.shownEntry, this.shownMedia);
+      this.shownEntry = null;
+      this.shownMedia = null;
+    }
+    while (this.element.firstChild) {
+      this.element.removeChild(this.element.firstChild);
     }
   }
 
@@ -216,6 +349,7 @@ export class PreviewTooltip {
     if (this.hideTimeout) {
       clearTimeout(this.hideTimeout);
     }
+    this.clearContent();
     // Remove event listeners properly
     document.removeEventListener('click', this.globalClickHandler);
     document.removeEventListener('scroll', this.globalScrollHandler, true);